@@ -2,30 +2,52 @@
 #                                               imports        
 # ======================================================================================================
 
-from openai import OpenAI
 from langchain_community.document_loaders import TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_ollama import OllamaEmbeddings
-from pydantic import BaseModel, Field,HttpUrl
+from langchain_core.embeddings import Embeddings
+from pydantic import BaseModel, Field,HttpUrl, ValidationError
+import io
 import re
 import datetime
 import logging
 import os
 import traceback
-from typing import Optional, List, Dict
+import threading
+from typing import Callable, Iterator, Optional, List, Dict
+from collections import deque
+from functools import lru_cache
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import calendar
-import pymongo
-from pdf_maker import pdfmaker
+from pdf_maker import pdf_cache_info, pdfmaker
+from array import array
+from caching import LRUCache, MongoCache, SQLiteCache, content_hash
+from resources import get_db, get_ollama_client, registry
+from dedup import save_resume_record
+from vector_index import VECTOR_INDEX_DIR, VectorIndex
+from bson.objectid import ObjectId
+from repository import (
+    INTERVIEWERS_COLLECTION,
+    MEETINGS_COLLECTION,
+    RESUMES_COLLECTION,
+    Repository,
+    interviewer_repository,
+    meeting_repository,
+    resume_repository,
+)
 import base64
 import time
 import json
 from docx import Document
-from pypdf import PdfReader
+from pdf_text import PdfBudgetExceeded, iter_pdf_pages, read_pdf_bytes
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+load_dotenv()
 
 
 # ======================================================================================================
@@ -55,17 +77,32 @@ streamlit_logger = logging.getLogger('streamlit')
 #                                       ollama llm connect        
 # ======================================================================================================
 
-ollama_client = OpenAI(
-    base_url="http://localhost:11434/v1",
-    api_key="ollama"
-)
-
-ollama_logger.info("Initializing Ollama client with base URL: http://localhost:11434/v1")
+# The Ollama client itself is created on first use by the resource registry (see resources.py)
 
 model = "llama3.2"
 # model = "mistral"
 ollama_logger.info(f"Using model: {model}")
 
+# Maximum number of resume sections extracted in parallel against Ollama
+MAX_LLM_WORKERS = int(os.getenv("MAX_LLM_WORKERS", "9"))
+ollama_logger.info(f"Using up to {MAX_LLM_WORKERS} concurrent LLM workers per resume")
+
+# Process-wide limit on in-flight Ollama calls, shared by all resumes parsed at the same time
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "16"))
+llm_call_slots = threading.BoundedSemaphore(MAX_CONCURRENT_LLM_CALLS)
+
+# Context window Ollama runs the model with. The OpenAI-compatible endpoint cannot set it per
+# request, so start the server with the same OLLAMA_CONTEXT_LENGTH; longer prompts are cut silently
+LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", "4096"))
+# Room left in the context for the single-pass reply, which holds all nine sections
+SINGLE_PASS_OUTPUT_TOKENS = int(os.getenv("SINGLE_PASS_OUTPUT_TOKENS", "1536"))
+# Upper bound on the resume size (estimated tokens) extracted with one combined LLM call; the
+# effective limit is also capped by what fits in LLM_CONTEXT_TOKENS (see SINGLE_PASS_TOKEN_BUDGET)
+SINGLE_PASS_TOKEN_LIMIT = int(os.getenv("SINGLE_PASS_TOKEN_LIMIT", "3000"))
+
+# Version of the extraction pipeline, stored in metadata and part of the parse cache key
+EXTRACTION_VERSION = "2.0.0"
+
 message = [
     {
         "role": "system",
@@ -88,15 +125,6 @@ When information is not explicitly stated but strongly implied, note this in you
 
 ollama_logger.info("Setting up system message for resume analysis")
 
-try:
-    response = ollama_client.chat.completions.create(
-        model=model,
-        messages=message,
-    )
-    ollama_logger.info("Initial Ollama connection successful")
-except Exception as e:
-    ollama_logger.error(f"Failed to connect to Ollama: {str(e)}")
-
 # ======================================================================================================
 #                                   Pydantic response format for RESUME
 # ======================================================================================================
@@ -199,6 +227,18 @@ class AchievementsDetails(BaseModel):
 class AchievementsList(BaseModel):
     list_of_achievements: List[AchievementsDetails]
 
+class ResumeDetails(BaseModel):
+    """Complete resume: all sections extracted together in a single pass"""
+    Personal_Details: PersonalDetails
+    Professional_Summary: ProfessionalSummary
+    Work_Experience: ExperienceList
+    Education_Details: EducationList
+    Skills_Details: SkillsDetails
+    Certifications_Details: CertificationsList
+    Projects_Details: ProjectList
+    Additional_Information: Additional_Information
+    Achievements_Details: AchievementsList
+
 # ======================================================================================================
 #                                   Pydantic response format for Meeting
 # ======================================================================================================
@@ -338,38 +378,157 @@ Education / Teaching - Primary Education',Higher Education',
 Psychology - Clinical Psychology',Research Psychology'
                 '''
 
-msg = [msg1, msg2, msg3, msg4, msg5, msg6, msg7, msg8, msg9, msg10]
+# Prompt for the single-pass mode, where the whole resume is sent once with the ResumeDetails schema
+msg_all = message[0]["content"] + """
+Extract all of the sections above from the complete resume in one response. Use an empty list for sections that are not present in the resume."""
+
+# ======================================================================================================
+#                                     retrieval plan per resume section
+# ======================================================================================================
+
+class SectionPlan(BaseModel):
+    """Retrieval and extraction settings for one resume section"""
+    name: str = Field(description="Key of the section in the parsed result")
+    query: str = Field(description="Similarity search query, also used as the extraction prompt")
+    response_format: type[BaseModel] = Field(description="Pydantic schema the section is extracted into")
+    k: int = Field(default=5, description="Number of chunks retrieved for the section")
+    retrieve: bool = Field(default=True, description="Retrieve relevant chunks; when False the whole resume is sent")
+
+DEFAULT_SECTION_PLAN = [
+    SectionPlan(name="Personal_Details", query=msg1, response_format=PersonalDetails, k=5),
+    SectionPlan(name="Professional_Summary", query=msg2, response_format=ProfessionalSummary, k=5),
+    SectionPlan(name="Work_Experience", query=msg3, response_format=ExperienceList, k=5),  # more context needed
+    SectionPlan(name="Education_Details", query=msg4, response_format=EducationList, k=5),
+    SectionPlan(name="Skills_Details", query=msg5, response_format=SkillsDetails, k=6),  # spread throughout document
+    SectionPlan(name="Certifications_Details", query=msg6, response_format=CertificationsList, k=4),
+    SectionPlan(name="Projects_Details", query=msg7, response_format=ProjectList, k=5),  # may be scattered
+    SectionPlan(name="Additional_Information", query=msg8, response_format=Additional_Information, k=4),
+    SectionPlan(name="Achievements_Details", query=msg9, response_format=AchievementsList, k=4),
+]
+
+def load_section_plan(path: Optional[str]) -> List[SectionPlan]:
+    """Default plan with optional per-section ``k``/``retrieve`` overrides from a JSON file.
+
+    Example file: {"Additional_Information": {"k": 2}, "Personal_Details": {"retrieve": false}}
+    """
+    if not path or not os.path.exists(path):
+        return DEFAULT_SECTION_PLAN
+    with open(path) as file:
+        overrides = json.load(file)
+    resume_logger.info(f"Loading section plan overrides from {path}")
+    plan = []
+    for section in DEFAULT_SECTION_PLAN:
+        override = {key: value for key, value in overrides.get(section.name, {}).items() if key in ("k", "retrieve")}
+        plan.append(SectionPlan.model_validate({**dict(section), **override}))
+    return plan
+
+SECTION_PLAN = load_section_plan(os.getenv("SECTION_PLAN_FILE", "section_plan.json"))
+
+# Changes whenever any extraction prompt or retrieval setting changes, so cached parses are not reused
+PROMPT_VERSION = content_hash(
+    *(f"{section.name}:{section.query}:{section.k}:{section.retrieve}" for section in SECTION_PLAN),
+    msg_all, EXTRACTION_VERSION
+)[:16]
+
+# ======================================================================================================
+#                         precompiled patterns for resume text cleaning and splitting
+# ======================================================================================================
+
+# Section headers recognised by improved_text_splitter, one alternation group per section
+SPLITTER_SECTION_HEADERS = [
+    r'INTRODUCTION|ABOUT ME|PROFILE|SUMMARY|PROFESSIONAL SUMMARY',
+    r'WORK EXPERIENCE|PROFESSIONAL EXPERIENCE|EMPLOYMENT HISTORY|WORK HISTORY',
+    r'EDUCATION|ACADEMIC BACKGROUND|EDUCATIONAL QUALIFICATIONS|ACADEMIC QUALIFICATIONS',
+    r'SKILLS|TECHNICAL SKILLS|CORE COMPETENCIES|KEY SKILLS|PROFESSIONAL SKILLS',
+    r'PROJECTS|KEY PROJECTS|PROJECT EXPERIENCE|TECHNICAL PROJECTS',
+    r'CERTIFICATIONS|CERTIFICATES|COURSES|TRAINING|PROFESSIONAL DEVELOPMENT',
+    r'PERSONAL INFORMATION|PERSONAL DETAILS|CONTACT INFORMATION|CONTACT DETAILS',
+    r'HOBBIES|INTERESTS|ACTIVITIES|EXTRACURRICULAR ACTIVITIES',
+    r'ACHIEVEMENTS|AWARDS|HONORS|ACCOMPLISHMENTS|PUBLICATIONS',
+    r'ADDITIONAL INFORMATION|OTHER INFORMATION|MISCELLANEOUS',
+    r'LANGUAGES|LANGUAGE PROFICIENCY',
+    r'VOLUNTEER EXPERIENCE|COMMUNITY SERVICE',
+    r'REFERENCES|PROFESSIONAL REFERENCES',
+]
+
+# One scan finds every boundary. The lookahead lets neighbouring headers share their "\n\n",
+# and group 2 + i tells which section pattern matched.
+SECTION_BOUNDARY_PATTERN = re.compile(
+    r'(?=(\n\n(?:' + '|'.join(f'({headers})' for headers in SPLITTER_SECTION_HEADERS) + r')\n\n))',
+    re.IGNORECASE
+)
+LEADING_HEADER_PATTERN = re.compile(r'^(\n\n[A-Z ]+\n\n)')
+
+# Section headers normalised by clean_resume_text, in priority order
+CLEANER_SECTION_HEADERS = [
+    (r'introduction|about\s*me|profile|summary|professional\s*summary', 'INTRODUCTION'),
+    (r'work\s*history|employment\s*history|professional\s*experience|work\s*experience', 'WORK EXPERIENCE'),
+    (r'education|academic\s*background|educational\s*qualifications', 'EDUCATION'),
+    (r'skills|technical\s*skills|core\s*competencies|key\s*skills', 'SKILLS'),
+    (r'personal\s*details?|personal\s*information|contact\s*details?|contact\s*information', 'PERSONAL INFORMATION'),
+    (r'projects|key\s*projects|project\s*experience|technical\s*projects', 'PROJECTS'),
+    (r'certifications|certificates|professional\s*development|courses|training', 'CERTIFICATIONS'),
+    (r'hobbies|interests|activities|extracurricular\s*activities', 'HOBBIES'),
+    (r'achievements|awards|honors|accomplishments|publications', 'ACHIEVEMENTS'),
+    (r'additional\s*information|other\s*information|miscellaneous', 'ADDITIONAL INFORMATION'),
+    (r'languages|language\s*proficiency', 'LANGUAGES'),
+    (r'volunteer\s*experience|community\s*service', 'VOLUNTEER EXPERIENCE'),
+    (r'references|professional\s*references', 'REFERENCES'),
+]
+
+# All header patterns in one alternation; the matched group number indexes the replacement table.
+# The lookahead on the first letters of all headers skips most words without trying the alternation.
+SECTION_HEADER_PATTERN = re.compile(
+    r'\b(?=[acehiklmoprstvw])(?:' + '|'.join(f'({pattern})' for pattern, _ in CLEANER_SECTION_HEADERS) + r')\b',
+    re.IGNORECASE
+)
+SECTION_HEADER_REPLACEMENTS = [f'\n\n{replacement}\n\n' for _, replacement in CLEANER_SECTION_HEADERS]
+
+# HTML tags and runs of spaces/tabs collapse to a single space. Lone spaces are already
+# normalised, so they are not matched at all; text without "<" uses the cheaper pattern.
+TAGS_AND_SPACES_PATTERN = re.compile(r'(?:<[^>]+>|[ \t]){2,}|<[^>]+>|\t')
+SPACES_PATTERN = re.compile(r'[ \t]{2,}|\t')
+CONTROL_CHARACTERS_PATTERN = re.compile(r'[\x00-\x1F\x7F-\x9F]+')
+ARTIFACTS_PATTERN = re.compile(r'\b(?=[pcr\d])(page\s*\d+|\d+\s*of\s*\d+|confidential|resume|cv|curriculum vitae)\b', re.IGNORECASE)
+SEPARATOR_PATTERN = re.compile(r'[-_=]{3,}')
+
+# Use more sophisticated content splitter with better preservation of context
+content_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=1100,  # Smaller chunk size for more precise retrieval
+    chunk_overlap=250,  # Larger overlap to maintain context
+    length_function=len,
+    separators=[
+        "\n\n\n",  # Major section breaks
+        "\n\n",     # Paragraph breaks
+        "\n• ", "\n- ", "\n* ", "\n○ ",  # List items
+        ". ", "! ", "? ",  # Sentence boundaries
+        ", ", "; ", " ", ""  # Word boundaries
+    ]
+)
+
+def find_section_boundaries(text: str) -> List[tuple]:
+    """(start, end, header) for every section header, in order of position.
+
+    Matches of the same section pattern never overlap each other, exactly like running one
+    re.finditer per pattern, but the text is scanned only once.
+    """
+    boundaries = []
+    last_end = [0] * len(SPLITTER_SECTION_HEADERS)
+    for match in SECTION_BOUNDARY_PATTERN.finditer(text):
+        index = next(i for i in range(len(SPLITTER_SECTION_HEADERS)) if match.start(i + 2) != -1)
+        if match.start(1) < last_end[index]:
+            continue
+        last_end[index] = match.end(1)
+        boundaries.append((match.start(1), match.end(1), match.group(1).strip()))
+    return boundaries
 
 # ======================================================================================================
 #                             get llm response using system prompt and classes for RESUME     
 # ======================================================================================================
 def improved_text_splitter(text: str) -> List[str]:
     """Advanced semantic-aware text splitting for resumes with better section recognition"""
-    # Expanded section pattern recognition
-    section_patterns = [
-        r'\n\n(?:INTRODUCTION|ABOUT ME|PROFILE|SUMMARY|PROFESSIONAL SUMMARY)\n\n',
-        r'\n\n(?:WORK EXPERIENCE|PROFESSIONAL EXPERIENCE|EMPLOYMENT HISTORY|WORK HISTORY)\n\n',
-        r'\n\n(?:EDUCATION|ACADEMIC BACKGROUND|EDUCATIONAL QUALIFICATIONS|ACADEMIC QUALIFICATIONS)\n\n',
-        r'\n\n(?:SKILLS|TECHNICAL SKILLS|CORE COMPETENCIES|KEY SKILLS|PROFESSIONAL SKILLS)\n\n',
-        r'\n\n(?:PROJECTS|KEY PROJECTS|PROJECT EXPERIENCE|TECHNICAL PROJECTS)\n\n',
-        r'\n\n(?:CERTIFICATIONS|CERTIFICATES|COURSES|TRAINING|PROFESSIONAL DEVELOPMENT)\n\n',
-        r'\n\n(?:PERSONAL INFORMATION|PERSONAL DETAILS|CONTACT INFORMATION|CONTACT DETAILS)\n\n',
-        r'\n\n(?:HOBBIES|INTERESTS|ACTIVITIES|EXTRACURRICULAR ACTIVITIES)\n\n',
-        r'\n\n(?:ACHIEVEMENTS|AWARDS|HONORS|ACCOMPLISHMENTS|PUBLICATIONS)\n\n',
-        r'\n\n(?:ADDITIONAL INFORMATION|OTHER INFORMATION|MISCELLANEOUS)\n\n',
-        r'\n\n(?:LANGUAGES|LANGUAGE PROFICIENCY)\n\n',
-        r'\n\n(?:VOLUNTEER EXPERIENCE|COMMUNITY SERVICE)\n\n',
-        r'\n\n(?:REFERENCES|PROFESSIONAL REFERENCES)\n\n'
-    ]
-    
-    # Find all section boundaries
-    section_boundaries = []
-    for pattern in section_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            section_boundaries.append((match.start(), match.end(), match.group().strip()))
-    
-    # Sort boundaries by position
-    section_boundaries.sort(key=lambda x: x[0])
+    # Find all section boundaries, sorted by position
+    section_boundaries = find_section_boundaries(text)
     
     # Extract sections based on boundaries
     sections = []
@@ -387,24 +546,10 @@ def improved_text_splitter(text: str) -> List[str]:
             section_end = section_boundaries[i+1][0] if i < len(section_boundaries)-1 else len(text)
             sections.append(header + text[end:section_end])
     
-    # Use more sophisticated content splitter with better preservation of context
-    content_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1100,  # Smaller chunk size for more precise retrieval
-        chunk_overlap=250,  # Larger overlap to maintain context
-        length_function=len,
-        separators=[
-            "\n\n\n",  # Major section breaks
-            "\n\n",     # Paragraph breaks
-            "\n• ", "\n- ", "\n* ", "\n○ ",  # List items
-            ". ", "! ", "? ",  # Sentence boundaries
-            ", ", "; ", " ", ""  # Word boundaries
-        ]
-    )
-    
     final_chunks = []
     for section in sections:
         # Preserve section context in each chunk
-        section_match = re.match(r'^(\n\n[A-Z ]+\n\n)', section)
+        section_match = LEADING_HEADER_PATTERN.match(section)
         section_header = section_match.group(0) if section_match else ""
         
         if section_header:
@@ -422,51 +567,80 @@ def improved_text_splitter(text: str) -> List[str]:
 
 def clean_resume_text(text: str) -> str:
     """Enhanced text cleaning for resumes with better preprocessing and normalization"""
-    # Convert to plain text if needed (remove any HTML tags)
-    text = re.sub(r'<[^>]+>', ' ', text)
-    
-    # Standardize newlines and whitespace
-    text = re.sub(r'\r\n|\r', '\n', text)  # Standardize line breaks
-    text = re.sub(r'\n{3,}', '\n\n', text)  # Replace excessive newlines
-    text = re.sub(r'[ \t]+', ' ', text)     # Standardize spaces and tabs
+    # Remove HTML tags and standardize spaces and tabs in one pass
+    text = (TAGS_AND_SPACES_PATTERN if '<' in text else SPACES_PATTERN).sub(' ', text)
     
-    # Remove control characters and non-printable characters
-    text = re.sub(r'[\x00-\x1F\x7F-\x9F]', '', text)
+    # Remove control characters and non-printable characters (this includes all line breaks,
+    # so separate newline normalisation passes would have no effect on the output)
+    text = CONTROL_CHARACTERS_PATTERN.sub('', text)
     
     # Remove common resume artifacts, headers, and footers
-    text = re.sub(r'(?i)\b(page\s*\d+|\d+\s*of\s*\d+|confidential|resume|cv|curriculum vitae)\b', '', text)
-    text = re.sub(r'[-_=]{3,}', '', text)  # Remove separator lines
-    
-    # Fix common OCR and formatting issues
-    text = re.sub(r'•', '- ', text)  # Standardize bullet points
-    text = re.sub(r'(\d+)\.(\d+)', r'\1.\2', text)  # Fix merged decimals
-    text = re.sub(r'(\d+)/(\d+)/(\d+)', r'\1/\2/\3', text)  # Fix merged dates
+    text = ARTIFACTS_PATTERN.sub('', text)
+    text = SEPARATOR_PATTERN.sub('', text)  # Remove separator lines
     
-    # Standardize common section headers with comprehensive patterns
-    section_headers = {
-        r'(?i)\b(introduction|about\s*me|profile|summary|professional\s*summary)\b': 'INTRODUCTION',
-        r'(?i)\b(work\s*history|employment\s*history|professional\s*experience|work\s*experience)\b': 'WORK EXPERIENCE',
-        r'(?i)\b(education|academic\s*background|educational\s*qualifications)\b': 'EDUCATION',
-        r'(?i)\b(skills|technical\s*skills|core\s*competencies|key\s*skills)\b': 'SKILLS',
-        r'(?i)\b(personal\s*details?|personal\s*information|contact\s*details?|contact\s*information)\b': 'PERSONAL INFORMATION',
-        r'(?i)\b(projects|key\s*projects|project\s*experience|technical\s*projects)\b': 'PROJECTS',
-        r'(?i)\b(certifications|certificates|professional\s*development|courses|training)\b': 'CERTIFICATIONS',
-        r'(?i)\b(hobbies|interests|activities|extracurricular\s*activities)\b': 'HOBBIES',
-        r'(?i)\b(achievements|awards|honors|accomplishments|publications)\b': 'ACHIEVEMENTS',
-        r'(?i)\b(additional\s*information|other\s*information|miscellaneous)\b': 'ADDITIONAL INFORMATION',
-        r'(?i)\b(languages|language\s*proficiency)\b': 'LANGUAGES',
-        r'(?i)\b(volunteer\s*experience|community\s*service)\b': 'VOLUNTEER EXPERIENCE',
-        r'(?i)\b(references|professional\s*references)\b': 'REFERENCES',
-    }
+    # Standardize bullet points
+    text = text.replace('•', '- ')
     
-    for pattern, replacement in section_headers.items():
-        text = re.sub(pattern, f'\n\n{replacement}\n\n', text)
+    # Standardize common section headers with a single scan over all patterns
+    text = SECTION_HEADER_PATTERN.sub(lambda match: SECTION_HEADER_REPLACEMENTS[match.lastindex - 1], text)
     
     return text.strip()
 
+# ======================================================================================================
+#                             LLM response memoization for repeated section inputs
+# ======================================================================================================
+
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_PERSISTENT = os.getenv("LLM_CACHE_PERSISTENT", "0") == "1"
+LLM_CACHE_TTL_DAYS = int(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+LLM_CACHE_PERSISTENT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_PERSISTENT_MAX_ENTRIES", "50000"))
+
+llm_memory_cache = LRUCache(name="llm", max_entries=LLM_CACHE_MAX_ENTRIES)
+llm_persistent_cache = MongoCache(
+    lambda: get_db()["llm_cache"],
+    name="llm",
+    ttl_seconds=LLM_CACHE_TTL_DAYS * 24 * 3600,
+    max_entries=LLM_CACHE_PERSISTENT_MAX_ENTRIES,
+) if LLM_CACHE_PERSISTENT else None
+
+@lru_cache(maxsize=None)
+def schema_hash(response_format: type[BaseModel]) -> str:
+    """Hash of the JSON schema, so cached answers expire when the model's fields change"""
+    return content_hash(json.dumps(response_format.model_json_schema(), sort_keys=True))
+
+def llm_cache_key(userInput: str, message: str, response_format: type[BaseModel]) -> str:
+    """Memoization key: model, system prompt, user input and response schema"""
+    return content_hash(model, message, userInput, response_format.__name__, schema_hash(response_format))
+
+def get_cached_llm_response(key: str) -> Optional[dict]:
+    """Look the key up in memory first, then in the optional persistent tier"""
+    cached = llm_memory_cache.get(key)
+    if cached is None and llm_persistent_cache is not None:
+        cached = llm_persistent_cache.get(key)
+        if cached is not None:
+            llm_memory_cache.set(key, cached)
+    return cached
+
+def store_llm_response(key: str, parsed: BaseModel) -> None:
+    data = parsed.model_dump()
+    llm_memory_cache.set(key, data)
+    if llm_persistent_cache is not None:
+        llm_persistent_cache.set(key, data)
+
 def get_llm_response(userInput: str, message: str, response_format: type[BaseModel]) -> BaseModel:
         try:
             resume_logger.info(f"Extracting {response_format.__name__} details")
+
+            # Identical inputs (empty sections, boilerplate blocks) are answered from the cache
+            key = llm_cache_key(userInput, message, response_format)
+            cached = get_cached_llm_response(key)
+            if cached is not None:
+                try:
+                    resume_logger.info(f"Using memoized {response_format.__name__} details")
+                    return response_format.model_validate(cached)
+                except ValidationError as e:
+                    # Stored by an older version of the schema: ask the model again
+                    resume_logger.warning(f"Ignoring cached {response_format.__name__} details that no longer validate: {str(e)}")
             
             # Enhanced error handling with retries
             max_retries = 2
@@ -475,17 +649,21 @@ def get_llm_response(userInput: str, message: str, response_format: type[BaseMod
             while retry_count < max_retries:
                 try:
                     # Add temperature for more deterministic outputs
-                    response = ollama_client.beta.chat.completions.parse(
-                        model=model,
-                        messages=[
-                            {"role": "system", "content": message},
-                            {"role": "user", "content": userInput} 
-                        ],
-                        response_format=response_format,
-                        temperature=0.1 
-                    )
+                    with llm_call_slots:
+                        response = get_ollama_client().beta.chat.completions.parse(
+                            model=model,
+                            messages=[
+                                {"role": "system", "content": message},
+                                {"role": "user", "content": userInput} 
+                            ],
+                            response_format=response_format,
+                            temperature=0.1 
+                        )
                     resume_logger.info(f"Successfully extracted {response_format.__name__} details")
-                    return response.choices[0].message.parsed
+                    parsed = response.choices[0].message.parsed
+                    if parsed is not None:
+                        store_llm_response(key, parsed)
+                    return parsed
                 except Exception as e:
                     retry_count += 1
                     resume_logger.warning(f"Attempt {retry_count} failed: {str(e)}")
@@ -496,7 +674,303 @@ def get_llm_response(userInput: str, message: str, response_format: type[BaseMod
             resume_logger.error(f"Error getting LLM response: {str(e)}")
             raise
 
-def fn_Resume(resume_text: str) -> dict:
+# Sections whose results are needed before the classifier can run
+CLASSIFIER_INPUTS = ("Professional_Summary", "Work_Experience", "Education_Details", "Skills_Details")
+
+def classify_sections(sections: dict) -> BaseModel:
+    """Run the classifier on the sections it depends on"""
+    return fn_classifier(
+        {
+            'Summary': sections['Professional_Summary'].Summary,
+            'Work_Experience': [exp.model_dump() for exp in sections['Work_Experience'].list_of_experience],
+            'Education_Details': [edu.model_dump() for edu in sections['Education_Details'].list_of_education],
+            'Technical_skills': sections['Skills_Details'].Technical_skills
+        }
+    )
+
+def extract_sections(section_models: list, max_workers: int = MAX_LLM_WORKERS, on_section: Optional[Callable] = None) -> dict:
+    """Extract all resume sections concurrently and classify the resume.
+
+    Every section prompt is submitted to a thread pool at once. The classifier is
+    started as soon as all of its inputs have finished, while the remaining
+    sections are still running. A failing section is stored as an error string
+    and never affects the other sections. ``on_section(name, content)`` is called
+    as each section completes, with the classification last.
+    """
+    sections = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="section") as executor:
+        futures = {
+            executor.submit(get_llm_response, result_text, prompt, model_class): section_name
+            for section_name, result_text, prompt, model_class in section_models
+        }
+        classifier_future = None
+
+        for future in as_completed(futures):
+            section_name = futures[future]
+            try:
+                sections[section_name] = future.result()
+                resume_logger.info(f"Successfully processed {section_name}")
+            except Exception as e:
+                resume_logger.error(f"Error processing {section_name}: {str(e)}")
+                sections[section_name] = f"Error extracting {section_name}: {str(e)}"
+            if on_section is not None:
+                on_section(section_name, sections[section_name])
+
+            if classifier_future is None and all(name in sections for name in CLASSIFIER_INPUTS):
+                resume_logger.info("Classifier inputs ready, starting classification")
+                classifier_future = executor.submit(classify_sections, dict(sections))
+
+        if classifier_future is None:
+            classifier_future = executor.submit(classify_sections, dict(sections))
+
+        try:
+            classification = classifier_future.result()
+        except Exception as e:
+            resume_logger.error(f"Error during classification: {str(e)}")
+            classification = f"Error during classification: {str(e)}"
+        if on_section is not None:
+            on_section('Classification', classification)
+
+    # Keep the section order stable regardless of completion order
+    ordered = {section_name: sections[section_name] for section_name, *_ in section_models}
+    ordered['Classification'] = classification
+    return ordered
+
+# ======================================================================================================
+#                             embedding cache for resume chunks and section queries
+# ======================================================================================================
+
+EMBEDDING_MODEL = "nomic-embed-text:latest"
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "20000"))
+EMBEDDING_DISK_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_DISK_CACHE_MAX_ENTRIES", "200000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3")  # empty disables the disk tier
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that stores vectors by content hash.
+
+    Section queries are pinned in memory once and never evicted. Chunk vectors go to a bounded
+    LRU backed by an optional SQLite store, so identical chunks are embedded only once.
+    Uncached texts are sent to the model in requests of at most ``batch_size`` texts.
+    """
+
+    def __init__(self, base: Embeddings, model_name: str, max_entries: int, disk_cache: Optional[SQLiteCache] = None,
+                 batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.base = base
+        self.model_name = model_name
+        self.memory_cache = LRUCache(name="embeddings", max_entries=max_entries)
+        self.disk_cache = disk_cache
+        self.batch_size = max(1, batch_size)
+        self.batch_timings = deque(maxlen=200)
+        self._pinned = {}
+
+    def _key(self, text: str) -> str:
+        return content_hash(self.model_name, text)
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        vector = self._pinned.get(key)
+        if vector is None:
+            vector = self.memory_cache.get(key)
+        if vector is None and self.disk_cache is not None:
+            blob = self.disk_cache.get(key)
+            if blob is not None:
+                vector = array("d", blob).tolist()
+                self.memory_cache.set(key, vector)
+        return vector
+
+    def _store(self, key: str, vector: List[float]) -> None:
+        self.memory_cache.set(key, vector)
+        if self.disk_cache is not None:
+            self.disk_cache.set(key, array("d", vector).tobytes())
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors = {key: self._lookup(key) for key in set(keys)}
+        missing = {key: text for key, text in zip(keys, texts) if vectors[key] is None}
+        if missing:
+            resume_logger.info(f"Embedding {len(missing)} new texts ({len(vectors) - len(missing)} cached)")
+            vectors.update(self._embed_batches(list(missing.keys()), list(missing.values())))
+        return [vectors[key] for key in keys]
+
+    def _embed_batches(self, keys: List[str], texts: List[str]) -> Dict[str, List[float]]:
+        """Embed texts with one request per batch and record how long each batch took"""
+        vectors = {}
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            started = time.perf_counter()
+            batch_vectors = self.base.embed_documents(batch)
+            elapsed = time.perf_counter() - started
+            self.batch_timings.append({"size": len(batch), "seconds": round(elapsed, 4)})
+            resume_logger.info(f"Embedded batch of {len(batch)} texts in {elapsed:.2f}s")
+            for key, vector in zip(keys[start:start + self.batch_size], batch_vectors):
+                self._store(key, vector)
+                vectors[key] = vector
+        return vectors
+
+    def embed_many(self, chunk_lists: List[List[str]]) -> List[List[List[float]]]:
+        """Embed the chunks of several resumes together so batches are filled across documents"""
+        flat = [chunk for chunks in chunk_lists for chunk in chunks]
+        vectors = self.embed_documents(flat)
+        grouped, offset = [], 0
+        for chunks in chunk_lists:
+            grouped.append(vectors[offset:offset + len(chunks)])
+            offset += len(chunks)
+        return grouped
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def pin_queries(self, texts: List[str]) -> None:
+        """Embed constant queries once and keep them for the life of the process"""
+        for text, vector in zip(texts, self.embed_documents(texts)):
+            self._pinned[self._key(text)] = vector
+        resume_logger.info(f"Pinned {len(texts)} section query embeddings")
+
+    def info(self) -> Dict:
+        timings = list(self.batch_timings)
+        stats = {
+            "memory": self.memory_cache.info(),
+            "pinned_queries": len(self._pinned),
+            "batch_size": self.batch_size,
+            "recent_batches": len(timings),
+            "avg_batch_seconds": round(sum(t["seconds"] for t in timings) / len(timings), 4) if timings else 0.0,
+        }
+        if self.disk_cache is not None:
+            stats["disk"] = self.disk_cache.info()
+        return stats
+
+def _create_embeddings() -> CachedEmbeddings:
+    resume_logger.info(f"Using embedding model: {EMBEDDING_MODEL}")
+    disk_cache = SQLiteCache(EMBEDDING_CACHE_PATH, name="embeddings", max_entries=EMBEDDING_DISK_CACHE_MAX_ENTRIES) if EMBEDDING_CACHE_PATH else None
+    embeddings = CachedEmbeddings(OllamaEmbeddings(model=EMBEDDING_MODEL), EMBEDDING_MODEL, EMBEDDING_CACHE_MAX_ENTRIES, disk_cache, EMBEDDING_BATCH_SIZE)
+    try:
+        embeddings.pin_queries([section.query for section in SECTION_PLAN if section.retrieve])
+    except Exception as e:
+        resume_logger.warning(f"Could not pre-compute section query embeddings: {str(e)}")
+    return embeddings
+
+registry.register("embeddings", _create_embeddings)
+
+def get_embeddings() -> CachedEmbeddings:
+    """Shared cached embeddings instance; the section queries are embedded on first use"""
+    return registry.get("embeddings")
+
+# Resumes with at most this many chunks are searched with NumPy instead of a FAISS index
+NUMPY_RETRIEVAL_MAX_CHUNKS = int(os.getenv("NUMPY_RETRIEVAL_MAX_CHUNKS", "64"))
+
+def numpy_top_k(chunk_vectors: List[List[float]], query_vectors: List[List[float]], k_values: List[int]) -> List[List[int]]:
+    """Indices of the nearest chunks for every query, computed with one matrix multiply.
+
+    Chunks are ranked by squared L2 distance, the same metric FAISS.from_texts uses by default,
+    so small documents get the same results as a flat FAISS index.
+    """
+    chunks = np.asarray(chunk_vectors, dtype=np.float32)
+    queries = np.asarray(query_vectors, dtype=np.float32)
+    distances = (
+        np.einsum("ij,ij->i", queries, queries)[:, None]
+        + np.einsum("ij,ij->i", chunks, chunks)[None, :]
+        - 2.0 * queries @ chunks.T
+    )
+    order = np.argsort(distances, axis=1, kind="stable")
+    return [order[i, :k].tolist() for i, k in enumerate(k_values)]
+
+def retrieve_section_texts(cleaned_text: str, plan: List[SectionPlan]) -> tuple[Dict[str, str], int]:
+    """Input text for every section of the plan.
+
+    Only sections with ``retrieve`` set are embedded and searched; the others receive the
+    whole cleaned resume. Returns the texts by section name and the number of chunks.
+    """
+    results = {section.name: cleaned_text for section in plan if not section.retrieve}
+    retrieval = [section for section in plan if section.retrieve]
+    if not retrieval:
+        return results, 0
+
+    # Improved semantic chunking
+    documents = improved_text_splitter(cleaned_text)
+    resume_logger.info(f"Split resume into {len(documents)} semantic chunks")
+
+    embeddings = get_embeddings()
+
+    # Use a dummy embedding if no text is available
+    if not documents:
+        resume_logger.warning("No document chunks were created, using placeholder text")
+    texts = documents or ["Resume appears to be empty or unreadable"]
+
+    if len(texts) <= NUMPY_RETRIEVAL_MAX_CHUNKS:
+        resume_logger.info(f"Ranking chunks for {len(retrieval)} sections with a single NumPy similarity matrix")
+        nearest = numpy_top_k(
+            embeddings.embed_documents(texts),
+            embeddings.embed_documents([section.query for section in retrieval]),
+            [section.k for section in retrieval],
+        )
+        for section, indices in zip(retrieval, nearest):
+            results[section.name] = " ".join([texts[j] for j in indices])
+            resume_logger.debug(f"{section.name} search results length: {len(results[section.name])} characters")
+        return results, len(documents)
+
+    resume_logger.info("Creating FAISS vector store for semantic search")
+    db = FAISS.from_texts(texts, embeddings)
+
+    # Enhanced retrieval with more context per section
+    for section in retrieval:
+        resume_logger.info(f"Performing similarity search for {section.name}")
+        rs = db.similarity_search(section.query, k=section.k)
+        results[section.name] = " ".join([doc.page_content for doc in rs])
+        resume_logger.debug(f"{section.name} search results length: {len(results[section.name])} characters")
+
+    return results, len(documents)
+
+def prefetch_resume_embeddings(resume_texts: List[str]) -> None:
+    """Embed the chunks of many resumes in shared batches before they are parsed.
+
+    fn_Resume then finds every chunk vector in the embedding cache. Resumes short enough for
+    single-pass extraction are skipped because they never need retrieval.
+    """
+    chunk_lists = []
+    for resume_text in resume_texts:
+        cleaned_text = clean_resume_text(resume_text)
+        if estimate_tokens(cleaned_text) > SINGLE_PASS_TOKEN_BUDGET and any(section.retrieve for section in SECTION_PLAN):
+            chunk_lists.append(improved_text_splitter(cleaned_text))
+    if chunk_lists:
+        resume_logger.info(f"Prefetching embeddings for {len(chunk_lists)} resumes")
+        get_embeddings().embed_many(chunk_lists)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt sizing (about four characters per token)"""
+    return len(text) // 4
+
+# Resume tokens that fit in one combined call next to the msg_all prompt and the reply; the
+# ResumeDetails schema is passed as response_format, which constrains decoding instead of
+# occupying prompt tokens. Zero or less disables single-pass extraction
+SINGLE_PASS_TOKEN_BUDGET = min(
+    SINGLE_PASS_TOKEN_LIMIT,
+    LLM_CONTEXT_TOKENS - estimate_tokens(msg_all) - SINGLE_PASS_OUTPUT_TOKENS,
+)
+ollama_logger.info(f"Single-pass extraction for resumes up to ~{max(SINGLE_PASS_TOKEN_BUDGET, 0)} tokens")
+
+def extract_all_sections(cleaned_text: str, on_section: Optional[Callable] = None) -> dict:
+    """Extract every resume section with a single LLM call using the combined ResumeDetails schema"""
+    resume = get_llm_response(cleaned_text or "Resume appears to be empty or unreadable", msg_all, ResumeDetails)
+    sections = {section_name: getattr(resume, section_name) for section_name in ResumeDetails.model_fields}
+    if on_section is not None:
+        for section_name, section_content in sections.items():
+            on_section(section_name, section_content)
+
+    try:
+        sections['Classification'] = classify_sections(sections)
+    except Exception as e:
+        resume_logger.error(f"Error during classification: {str(e)}")
+        sections['Classification'] = f"Error during classification: {str(e)}"
+    if on_section is not None:
+        on_section('Classification', sections['Classification'])
+    return sections
+
+def fn_Resume(resume_text: str, on_section: Optional[Callable] = None, mode: str = "auto") -> dict:
+    """Parse a resume into its sections.
+
+    ``mode`` "auto" extracts short resumes in a single call; "per_section" always extracts the
+    sections separately, so ``on_section`` reports each one as soon as it is ready (streaming).
+    """
     resume_logger.info("Starting full resume analysis")
     
     if not resume_text.strip():
@@ -506,91 +980,39 @@ def fn_Resume(resume_text: str) -> dict:
     try:
         # Better text cleaning and preprocessing
         cleaned_text = clean_resume_text(resume_text)
-        
-        # Improved semantic chunking
-        documents = improved_text_splitter(cleaned_text)
-        resume_logger.info(f"Split resume into {len(documents)} semantic chunks")
 
-        # Use a more sophisticated embedding model if available
-        try:
-            embedding_model = "nomic-embed-text:latest"
-            resume_logger.info(f"Using embedding model: {embedding_model}")
-            embeddings = OllamaEmbeddings(model=embedding_model)
-        except Exception as e:
-            resume_logger.warning(f"Could not use specified embedding model, falling back to default: {str(e)}")
-            embeddings = OllamaEmbeddings(model="nomic-embed-text")
-
-        # Use a dummy embedding if no text is available
-        if not documents:
-            resume_logger.warning("No document chunks were created, using placeholder text")
-            db = FAISS.from_texts(["Resume appears to be empty or unreadable"], embeddings)
-        else:
-            resume_logger.info("Creating FAISS vector store for semantic search")
-            db = FAISS.from_texts(documents, embeddings)
-
-        # Enhanced retrieval with more context per section
-        results = []
-        for i, query in enumerate(msg):
-            resume_logger.info(f"Performing similarity search for section {i+1}")
-            # Retrieve more documents for complex sections
-            k_values = {
-                0: 5,  # Personal Details
-                1: 5,  # Professional Summary 
-                2: 5,  # Work Experience (more context needed)
-                3: 5,  # Education
-                4: 6,  # Skills (spread throughout document)
-                5: 4,  # Certifications
-                6: 5,  # Projects (may be scattered)
-                7: 4,  # Hobbies
-                8: 4   # Achievements
-            }
-            
-            rs = db.similarity_search(query, k=k_values.get(i, 5))
-            tx = " ".join([doc.page_content for doc in rs])
-            results.append(tx)
-            resume_logger.debug(f"Section {i+1} search results length: {len(tx)} characters")
-        
-        # Extract sections with enhanced error handling
-        sections = {}
-        section_models = [
-            ("Personal_Details", results[0], msg1, PersonalDetails),
-            ("Professional_Summary", results[1], msg2, ProfessionalSummary),
-            ("Work_Experience", results[2], msg3, ExperienceList),
-            ("Education_Details", results[3], msg4, EducationList),
-            ("Skills_Details", results[4], msg5, SkillsDetails),
-            ("Certifications_Details", results[5], msg6, CertificationsList),
-            ("Projects_Details", results[6], msg7, ProjectList),
-            ("Additional_Information", results[7], msg8, Additional_Information),
-            ("Achievements_Details", results[8], msg9, AchievementsList),
-        ]
-        
-        for section_name, result_text, prompt, model_class in section_models:
+        # Short resumes fit in one prompt, so all sections are extracted in a single call
+        sections = None
+        chunks_processed = 0
+        estimated_tokens = estimate_tokens(cleaned_text)
+        if mode == "auto" and estimated_tokens <= SINGLE_PASS_TOKEN_BUDGET:
+            resume_logger.info(f"Resume is ~{estimated_tokens} tokens, using single-pass extraction")
             try:
-                sections[section_name] = get_llm_response(result_text, prompt, model_class)
-                resume_logger.info(f"Successfully processed {section_name}")
+                sections = extract_all_sections(cleaned_text, on_section)
+                extraction_mode = "single_pass"
             except Exception as e:
-                resume_logger.error(f"Error processing {section_name}: {str(e)}")
-                sections[section_name] = f"Error extracting {section_name}: {str(e)}"
+                resume_logger.warning(f"Single-pass extraction failed, falling back to per-section mode: {str(e)}")
 
-        try:
-            sections['Classification'] = fn_classifier(
-                {
-                    'Summary': sections['Professional_Summary'].Summary,
-                    'Work_Experience': [exp.model_dump() for exp in sections['Work_Experience'].list_of_experience],
-                    'Education_Details': [edu.model_dump() for edu in sections['Education_Details'].list_of_education],
-                    'Technical_skills': sections['Skills_Details'].Technical_skills
-                }
-            )
-        except Exception as e:
-            resume_logger.error(f"Error during classification: {str(e)}")
-            sections['Classification'] = f"Error during classification: {str(e)}"
+        if sections is None:
+            resume_logger.info(f"Resume is ~{estimated_tokens} tokens, using per-section extraction")
+            results, chunks_processed = retrieve_section_texts(cleaned_text, SECTION_PLAN)
+
+            # Extract sections with enhanced error handling
+            section_models = [
+                (section.name, results[section.name], section.query, section.response_format)
+                for section in SECTION_PLAN
+            ]
+            
+            sections = extract_sections(section_models, on_section=on_section)
+            extraction_mode = "per_section"
         
         # Add metadata about the extraction process
         sections["metadata"] = {
             "extraction_timestamp": datetime.now().isoformat(),
             "model_used": model,
-            "chunks_processed": len(documents),
-            "version": "2.0.0"
+            "extraction_mode": extraction_mode,
+            "chunks_processed": chunks_processed,
+            "version": EXTRACTION_VERSION
         }
         
         return sections
@@ -610,7 +1032,7 @@ def extract_meeting_info(user_input: str) -> Optional[MeetingInfo]:
     
     try:
         meeting_logger.info("Calling Ollama model for meeting extraction")
-        response = ollama_client.beta.chat.completions.parse(
+        response = get_ollama_client().beta.chat.completions.parse(
             model=model,
             messages=[
                 {
@@ -687,7 +1109,7 @@ def fn_classifier(all_d: dict) -> str:
         all_d_str = json.dumps(all_d)
         
         # Call the LLM with the prompt
-        response = ollama_client.beta.chat.completions.parse(
+        response = get_ollama_client().beta.chat.completions.parse(
             model=model,
             messages=[
                 {
@@ -748,44 +1170,27 @@ def fn_classifier(all_d: dict) -> str:
 #                                       DATA STORAGE CONFIGURATION in MongoDB
 # ======================================================================================================
 
-MEETINGS_FILE = "meeting_records"
-RESUMES_FILE = "job_application"
-INTERVIEWERS_FILE = "interviewers"
-
-myclient = pymongo.MongoClient("mongodb://localhost:27017/")
-mydb = myclient["resumedb"]
+# Collections are accessed through the typed repositories in repository.py
+MEETINGS_FILE = MEETINGS_COLLECTION
+RESUMES_FILE = RESUMES_COLLECTION
+INTERVIEWERS_FILE = INTERVIEWERS_COLLECTION
 
 def load_data(collection_name: str) -> List[Dict]:
     """Safely load data from MongoDB collection"""
     try:
-        collection = mydb[collection_name]
-        # Exclude MongoDB's _id field from results
-        data = list(collection.find())
+        data = Repository(collection_name).find_all()
         streamlit_logger.debug(f"Successfully loaded {len(data)} records from {collection_name}")
         return data
     except Exception as e:
         streamlit_logger.error(f"Error loading data from MongoDB: {str(e)}")
         return []
 
-def save_data(data: List[Dict], collection_name: str) -> None:
+def save_data(data: List[Dict], collection_name: str) -> bool:
     """Safely save data to MongoDB collection"""
     try:
-        collection = mydb[collection_name]
-        
-        result = collection.insert_one(data[-1])  # Use copy to avoid any modification issues
-        streamlit_logger.info(f"Insert result: {result.inserted_id}")
-            
-        # Verify insertion
-        if result.inserted_id:
-            found = collection.find_one({"_id": result.inserted_id})
-            if found:
-                streamlit_logger.info("Document verified in database")
-                return True
-            else:
-                streamlit_logger.error("Document not found after insertion")
-                return False
-        return False
-        
+        # The client's write concern confirms the insert, no read-back needed
+        Repository(collection_name).insert(data[-1])
+        return True
     except Exception as e:
         streamlit_logger.error(f"Save error: {str(e)}", exc_info=True)
         return False
@@ -801,8 +1206,8 @@ def serialize_pydantic_model(model) -> Dict:
         raise ValueError(f"Could not serialize model: {str(e)}")
 
 
-def save_parsed_resume(structured_data: dict, resume_text: str, filename: str) -> None:
-    """Save parsed resume data to MongoDB"""
+def save_parsed_resume(structured_data: dict, resume_text: str, filename: str):
+    """Save parsed resume data to MongoDB and return the id of the candidate's record"""
     try:
         global resume_jsn_data
         # Convert all Pydantic models to serializable dicts
@@ -818,52 +1223,239 @@ def save_parsed_resume(structured_data: dict, resume_text: str, filename: str) -
             "parsed_data": serializable_data,
             "raw_text_sample": resume_text[:1000] + ("..." if len(resume_text) > 1000 else "")
         }
-        # Save directly to MongoDB (no list handling needed)
-        save_data([resume_record], "job_application")
+        # Re-submitted candidates are merged into their existing record (see dedup.py);
+        # failed writes raise here instead of being reported as a missing document later
+        resume_id = save_resume_record(resume_record)
         
     except Exception as e:
         streamlit_logger.error(f"Failed to save resume data: {str(e)}")
         raise
 
+    if CANDIDATE_INDEX_ENABLED:
+        try:
+            index_candidate(resume_id, serializable_data)
+        except Exception as e:
+            # The resume is stored; `python vector_index.py rebuild` picks it up later
+            resume_logger.warning(f"Could not add resume {resume_id} to the candidate index: {str(e)}")
+    return resume_id
+
+# ======================================================================================================
+#                                   SEMANTIC CANDIDATE SEARCH
+# ======================================================================================================
+
+CANDIDATE_INDEX_ENABLED = os.getenv("CANDIDATE_INDEX_ENABLED", "1") == "1"
+# Longest profile text embedded per candidate
+CANDIDATE_PROFILE_MAX_CHARS = int(os.getenv("CANDIDATE_PROFILE_MAX_CHARS", "4000"))
+# Extra hits fetched so merged resumes and category filtering still leave enough results
+SEARCH_OVERFETCH = 4
+
+# Contact details are left out: they carry no meaning for matching a job description
+CANDIDATE_PROFILE_SECTIONS = (
+    "Classification", "Professional_Summary", "Work_Experience", "Skills_Details", "Projects_Details",
+    "Education_Details", "Certifications_Details", "Achievements_Details", "Additional_Information",
+)
+
+candidate_index = VectorIndex(VECTOR_INDEX_DIR, EMBEDDING_MODEL)
+
+def _iter_strings(value) -> Iterator[str]:
+    if isinstance(value, str):
+        if value.strip():
+            yield value.strip()
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_strings(item)
+
+def candidate_profile_text(parsed_data: Dict) -> str:
+    """One text per candidate from the parsed sections, embedded for semantic search"""
+    text = "\n".join(
+        string
+        for section_name in CANDIDATE_PROFILE_SECTIONS
+        for string in _iter_strings(parsed_data.get(section_name))
+    )
+    return text[:CANDIDATE_PROFILE_MAX_CHARS]
+
+def index_candidate(resume_id, parsed_data: Dict) -> None:
+    """Add or refresh the profile vector of one stored resume"""
+    text = candidate_profile_text(parsed_data)
+    if text:
+        candidate_index.add([str(resume_id)], get_embeddings().embed_documents([text]))
+
+def rebuild_candidate_index() -> int:
+    """Re-embed every stored resume into a fresh, compacted index"""
+    def batches():
+        ids, texts = [], []
+        for document in resume_repository.find_page(fields=["parsed_data"]):
+            text = candidate_profile_text(document.get("parsed_data") or {})
+            if text:
+                ids.append(str(document["_id"]))
+                texts.append(text)
+            if len(ids) >= EMBEDDING_BATCH_SIZE:
+                yield ids, get_embeddings().embed_documents(texts)
+                ids, texts = [], []
+        if ids:
+            yield ids, get_embeddings().embed_documents(texts)
+
+    return candidate_index.rebuild(batches())
+
+def search_candidates(query: str, limit: int = 10, category: Optional[str] = None) -> List[Dict]:
+    """Stored candidates ranked by similarity of their profile to a job description or query"""
+    hits = candidate_index.search(get_embeddings().embed_query(query), limit * SEARCH_OVERFETCH)
+    if not hits:
+        return []
+    resume_filter = {"_id": {"$in": [ObjectId(resume_id) for resume_id, _ in hits]}}
+    if category:
+        resume_filter["parsed_data.Classification.category"] = category
+    projection = ["filename", "upload_date", "parsed_data.Personal_Details", "parsed_data.Classification"]
+    documents = {document["_id"]: document for document in resume_repository.find_page(resume_filter, projection)}
+
+    results = []
+    for resume_id, score in hits:
+        # Resumes merged away or outside the requested category are skipped
+        document = documents.get(ObjectId(resume_id))
+        if document is None:
+            continue
+        parsed_data = document.get("parsed_data", {})
+        personal = parsed_data.get("Personal_Details") or {}
+        results.append({
+            "resume_id": resume_id,
+            "score": round(score, 4),
+            "filename": document.get("filename"),
+            "upload_date": document.get("upload_date"),
+            "Full_Name": personal.get("Full_Name"),
+            "Email_Address": personal.get("Email_Address"),
+            "category": (parsed_data.get("Classification") or {}).get("category"),
+        })
+        if len(results) == limit:
+            break
+    return results
+
+# ======================================================================================================
+#                                   PARSE CACHE for repeated resumes
+# ======================================================================================================
+
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "1") == "1"
+PARSE_CACHE_TTL_DAYS = int(os.getenv("PARSE_CACHE_TTL_DAYS", "30"))
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "10000"))
+
+parse_cache = MongoCache(
+    lambda: get_db()["parse_cache"],
+    name="parse",
+    ttl_seconds=PARSE_CACHE_TTL_DAYS * 24 * 3600,
+    max_entries=PARSE_CACHE_MAX_ENTRIES,
+)
+
+def parse_cache_key(resume_text: str, filename: Optional[str] = None, mode: str = "auto") -> str:
+    """Cache key for a resume: extracted text, model, prompt version and extraction mode.
+
+    The "<filename> " prefix added by extract_resume_text is left out, so the same resume
+    re-uploaded under another name (``CV (1).pdf``) reuses the stored parse. Single-pass and
+    per-section extraction can return different results, so each mode keeps its own entry.
+    """
+    if filename and resume_text.startswith(filename + " "):
+        resume_text = resume_text[len(filename) + 1:]
+    return content_hash(resume_text, model, PROMPT_VERSION, mode)
+
+def is_cacheable(sections: dict) -> bool:
+    """Only complete parses are cached; error strings from failed sections are not"""
+    if not sections or "error" in sections:
+        return False
+    return not any(isinstance(value, str) for key, value in sections.items() if key != "metadata")
+
+def fn_Resume_cached(resume_text: str, on_section: Optional[Callable] = None, mode: str = "auto",
+                     filename: Optional[str] = None) -> dict:
+    """Parse a resume, reusing the stored result when the same text was parsed before"""
+    if not PARSE_CACHE_ENABLED:
+        return fn_Resume(resume_text, on_section, mode)
+
+    key = parse_cache_key(resume_text, filename, mode)
+    cached = parse_cache.get(key)
+    if cached is not None:
+        resume_logger.info("Returning cached parse result, skipping fn_Resume")
+        cached.setdefault("metadata", {})["cache_hit"] = True
+        if on_section is not None:
+            for section_name, section_content in cached.items():
+                if section_name != "metadata":
+                    on_section(section_name, section_content)
+        return cached
+
+    sections = fn_Resume(resume_text, on_section, mode)
+    if is_cacheable(sections):
+        parse_cache.set(key, {
+            section_name: serialize_pydantic_model(section_content)
+            for section_name, section_content in sections.items()
+        })
+    return sections
+
+def cache_stats() -> Dict:
+    """Hit/miss counters for every cache used by the resume pipeline"""
+    stats = {"parse_cache": parse_cache.info(), "llm_memory_cache": llm_memory_cache.info()}
+    if llm_persistent_cache is not None:
+        stats["llm_persistent_cache"] = llm_persistent_cache.info()
+    if registry.is_initialized("embeddings"):
+        stats["embedding_cache"] = get_embeddings().info()
+    stats["candidate_index"] = candidate_index.info()
+    stats["pdf_cache"] = pdf_cache_info()
+    return stats
+
 def extract_text_from_pdf(file_path_or_object):
     try:
-        if isinstance(file_path_or_object, str):
-            # It's a file path
-            with open(file_path_or_object, 'rb') as file:
-                reader = PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-        else:
-            # It's a file object
-            reader = PdfReader(file_path_or_object)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
-        return text.strip()
+        # Pages are streamed from a generator (in parallel for long documents) and joined once
+        data = read_pdf_bytes(file_path_or_object)
+        return "".join(iter_pdf_pages(data)).strip()
+    except PdfBudgetExceeded as e:
+        logging.error(f"Rejected PDF: {str(e)}")
+        return ""
     except Exception as e:
         logging.error(f"Error extracting text from PDF: {str(e)}")
         return ""
 
+def iter_docx_blocks(doc) -> Iterator[str]:
+    """Yield non-empty paragraph texts, then table cell texts.
+
+    python-docx returns a merged cell once for every grid position it spans, so cells are
+    de-duplicated by their underlying XML element.
+    """
+    for para in doc.paragraphs:
+        if para.text.strip():
+            yield para.text
+    for table in doc.tables:
+        seen_cells = set()
+        for row in table.rows:
+            for cell in row.cells:
+                # Keep the element itself: lxml proxies (and their ids) are recreated once released
+                if cell._tc in seen_cells:
+                    continue
+                seen_cells.add(cell._tc)
+                cell_text = cell.text.strip()
+                if cell_text:
+                    yield cell_text
+
 def extract_text_from_docx(file_path_or_object):
     try:
         if isinstance(file_path_or_object, str):
             # It's a file path
             doc = Document(file_path_or_object)
         else:
-            # It's a file object
-            doc = Document(file_path_or_object)
-            
-        paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
-        
-        # Extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if cell.text.strip():
-                        paragraphs.append(cell.text.strip())
-        
-        return "\n\n".join(paragraphs)
+            # Upload streams are read into memory; python-docx needs a seekable file
+            doc = Document(io.BytesIO(file_path_or_object.read()))
+
+        return "\n\n".join(iter_docx_blocks(doc))
     except Exception as e:
         logging.error(f"Error extracting text from DOCX: {str(e)}")
-        return ""
\ No newline at end of file
+        return ""
+
+SUPPORTED_RESUME_EXTENSIONS = ("pdf", "docx")
+
+def extract_resume_text(filename: str, file_object) -> str:
+    """Extract the text of an uploaded resume, prefixed with its filename like /parse_resume does"""
+    file_extension = filename.rsplit('.', 1)[-1].lower()
+    if file_extension == 'pdf':
+        text = extract_text_from_pdf(file_object)
+    elif file_extension == 'docx':
+        text = extract_text_from_docx(file_object)
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+    return filename + " " + (text or "")
@@ -0,0 +1,335 @@
+"""Micro-benchmark for the resume HTML renderer.
+
+Runs the previous string-concatenating implementation (kept below, verbatim) and the compiled
+template in pdf_maker.py on the same resume, checks that both show the same text and reports
+the time and memory allocated per render. With --pdf the whole PDF render is timed as well:
+the previous way (stylesheet embedded in every document) against render_pdf_bytes (stylesheet
+parsed once per thread).
+
+    python benchmarks/bench_resume_html.py [--repeat 500] [--pdf] [parsed_resume.json ...]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_maker import RESUME_CSS, generate_resume_html, render_pdf_bytes
+from resources import get_weasyprint
+
+# ======================================================================================================
+#                                   previous implementation (reference)
+# ======================================================================================================
+
+def legacy_generate_resume_html(data, embed_css=True):
+    personal = data.get("Personal_Details", {})
+    summary = data.get("Professional_Summary", {})
+    experience = data.get("Work_Experience", {}).get("list_of_experience", [])
+    education = data.get("Education_Details", {}).get("list_of_education", [])
+    skills = data.get("Skills_Details", {})
+    certifications = data.get("Certifications_Details", {}).get("list_of_certificates", [])
+    projects = data.get("Projects_Details", {}).get("list_of_projects", [])
+    additional = data.get("Additional_Information", {})
+    achievements = data.get("Achievements_Details", {}).get("list_of_achievements", [])
+
+    def format_date(date_str):
+        for fmt in ('%B %Y', '%Y-%m-%d'):
+            try:
+                return datetime.strptime(date_str, fmt).strftime('%b %Y')
+            except:
+                continue
+        return date_str or ""
+
+    def list_items(items, bullet_char="•"):
+        return ''.join(f"<li>{bullet_char} {item}</li>" for item in items)
+
+    def format_skills(skill_items):
+        html = ""
+        for skill in skill_items:
+            parts = skill.split(':')
+            if len(parts) > 1:
+                html += f"<li><strong>{parts[0].strip()}:</strong> {parts[1].strip()}</li>"
+            else:
+                html += f"<li>{parts[0]}</li>"
+        return html
+
+    style = f"<style>{RESUME_CSS}</style>" if embed_css else ""
+    html = f"""
+    <html>
+    <head>
+        {style}
+    </head>
+    <body>
+        <div class="header">
+            <h1>{personal.get("Full_Name", "")}</h1>
+            <div class="contact-info">
+                {personal.get("Email_Address", "")} | {personal.get("Phone_Number", "")} | {personal.get("City", "")}, {personal.get("State", "")}
+            </div>
+            <div class="contact-links">
+                {" | ".join(filter(None, [
+                    f'<a href="{personal.get("LinkedIn_Profile", "#")}">LinkedIn</a>' if personal.get("LinkedIn_Profile") else "",
+                    f'<a href="{personal.get("GitHub_Profile", "#")}">GitHub</a>' if personal.get("GitHub_Profile") else "",
+                    f'<a href="{personal.get("Portfolio_Website")}">Portfolio</a>' if personal.get("Portfolio_Website") else ""
+                ]))}
+            </div>
+        </div>
+
+        <div class="section">
+            <h2>Professional Summary</h2>
+            <ul>
+                <li>{summary.get("Summary", "")}</li>
+                {f'<li>{summary["Objective"]}</li>' if summary.get("Objective") else ''}
+            </ul>
+        </div>
+
+        <div class="section">
+            <h2>Work Experience</h2>
+    """
+    for exp in experience:
+        start = format_date(exp.get("start_date"))
+        end = format_date(exp.get("end_date") or "Present")
+        duration = f"{start} - {end}" if start or end else exp.get("duration", "")
+        html += f"""
+            <div class="item">
+                <h3>{exp.get("company", "")}</h3>
+                <div class="meta">{exp.get("title", "")} | {exp.get("location", "")} | {duration}</div>
+                {f'<div><strong>Technologies Used:</strong> <ul class="inline-list">{list_items(exp["technologies_used"], "")}</ul></div>' if exp.get("technologies_used") else ''}
+            </div>
+        """
+
+    html += """
+        </div>
+
+        <div class="section">
+            <h2>Education</h2>
+    """
+    for edu in education:
+        years = edu.get("years", f"{format_date(edu.get('start_date'))} - {format_date(edu.get('end_date'))}")
+        html += f"""
+            <div class="item">
+                <h3>{edu.get("degree", "")}</h3>
+                <div class="meta">{edu.get("institution", "")} | {years} {f"| GPA: {edu.get('percentage')}" if edu.get("percentage") else ''}</div>
+                {f'<div><strong>Specialization:</strong> {edu["specialization"]}</div>' if edu.get("specialization") else ''}
+                {f'<div><strong>Relevant Coursework:</strong> <ul class="inline-list">{list_items(edu["relevant_coursework"], "")}</ul></div>' if edu.get("relevant_coursework") else ''}
+                {f'<div><strong>Achievements:</strong> <ul>{list_items(edu["achievements"])}</ul></div>' if edu.get("achievements") else ''}
+            </div>
+        """
+
+    html += """
+        </div>
+
+        <div class="section">
+            <h2>Technical Skills</h2>
+    """
+    for title, key in [("Programming Languages", "Programming_Languages"), 
+                      ("Frameworks & Libraries", "Frameworks_Libraries"),
+                      ("Tools & Software", "Tools_Software"),
+                      ("Methodologies", "Methodologies")]:
+        if skills.get(key):
+            html += f"""
+            <h3>{title}</h3>
+            <ul class="inline-list">{list_items(skills[key], "")}</ul>
+            """
+
+
+    if certifications:
+        html += """
+        <div class="section">
+            <h2>Certifications</h2>
+            <ul>
+        """
+        for cert in certifications:
+            html += f"""
+                <li><strong>{cert.get('Certification_name')}</strong> - {cert.get('Issuing_organization')}</li>
+            """
+        html += "</ul></div>"
+
+    if projects:
+        html += """
+        <div class="section">
+            <h2>Projects</h2>
+        """
+        for proj in projects:
+            html += f"""
+            <div class="project-item">
+                <h3>{proj.get("Project_name")}</h3>
+                <div class="meta"><strong>Role:</strong> {proj.get("Role", "")} | <strong>Duration:</strong> {proj.get("Duration", "")}</div>
+                <div>{proj.get("Project_description", "")}</div>
+                {f'<div><strong>Technologies Used:</strong> <ul class="inline-list">{list_items(proj["Technologies_used"], "")}</ul></div>' if proj.get("Technologies_used") else ''}
+                {f'<div><strong>Key Achievements:</strong> <ul>{list_items(proj["Key_achievements"])}</ul></div>' if proj.get("Key_achievements") else ''}
+            </div>
+            """
+        html += "</div>"
+
+    if additional:
+        html += """
+        <div class="section">
+            <h2>Additional Information</h2>
+        """
+        for key, label in [("Hobbies", "Hobbies"), ("Interests", "Interests"), ("Languages", "Languages")]:
+            if additional.get(key):
+                html += f"""
+                <h3>{label}</h3>
+                <ul class="inline-list">{list_items(additional[key], "")}</ul>
+                """
+        if additional.get("Availability"):
+            html += f"""
+            <h3>Availability</h3>
+            <div>{additional['Availability']}</div>
+            """
+        html += "</div>"
+
+    if achievements:
+        html += """
+        <div class="section">
+            <h2>Key Achievements</h2>
+            <ul>
+        """
+        for ach in achievements:
+            impact = f" <em>(Impact: {ach['Impact']})</em>" if ach.get("Impact") else ""
+            html += f"""
+                <li>{ach.get('Achievement_description', '')}{impact}</li>
+            """
+        html += "</ul></div>"
+
+    html += "</body></html>"
+    return html
+
+# ======================================================================================================
+#                                       sample data and measurement
+# ======================================================================================================
+
+SAMPLE_RESUME: Dict[str, Any] = {
+    "Personal_Details": {
+        "Full_Name": "Jane Doe", "Email_Address": "jane.doe@example.com", "Phone_Number": "+1 555 010 2030",
+        "City": "Austin", "State": "TX", "LinkedIn_Profile": "https://linkedin.com/in/janedoe",
+        "GitHub_Profile": "https://github.com/janedoe",
+    },
+    "Professional_Summary": {
+        "Summary": "Backend engineer with eight years of experience building data platforms.",
+        "Objective": "Lead a platform team working on large scale ingestion.",
+    },
+    "Work_Experience": {"list_of_experience": [
+        {"company": f"Company {i}", "title": "Senior Engineer", "location": "Remote",
+         "start_date": "2018-01-01", "end_date": "March 2021" if i else None,
+         "technologies_used": ["Python", "PostgreSQL", "Kafka", "Kubernetes", "Terraform"]}
+        for i in range(6)
+    ]},
+    "Education_Details": {"list_of_education": [
+        {"degree": "B.Sc. Computer Science", "institution": "State University", "years": "2010 - 2014",
+         "percentage": "3.8", "specialization": "Distributed Systems",
+         "relevant_coursework": ["Algorithms", "Databases", "Operating Systems", "Networks"],
+         "achievements": ["Dean's list", "Programming contest finalist"]},
+    ]},
+    "Skills_Details": {
+        "Programming_Languages": ["Python", "Go", "SQL", "TypeScript"],
+        "Frameworks_Libraries": ["Flask", "FastAPI", "React", "Pandas"],
+        "Tools_Software": ["Docker", "Git", "Airflow"],
+        "Methodologies": ["Agile", "TDD"],
+    },
+    "Certifications_Details": {"list_of_certificates": [
+        {"Certification_name": "AWS Solutions Architect", "Issuing_organization": "Amazon"},
+        {"Certification_name": "CKA", "Issuing_organization": "CNCF"},
+    ]},
+    "Projects_Details": {"list_of_projects": [
+        {"Project_name": f"Project {i}", "Role": "Lead", "Duration": "6 months",
+         "Project_description": "Streaming ingestion pipeline for click events.",
+         "Technologies_used": ["Kafka", "Flink", "S3"], "Key_achievements": ["Cut latency by 80%", "Saved $20k per month"]}
+        for i in range(4)
+    ]},
+    "Additional_Information": {"Hobbies": ["Climbing"], "Languages": ["English", "Spanish"], "Availability": "Immediate"},
+    "Achievements_Details": {"list_of_achievements": [
+        {"Achievement_description": "Speaker at PyCon", "Impact": "300 attendees"},
+        {"Achievement_description": "Open source maintainer"},
+    ]},
+}
+
+
+class _TextExtractor(HTMLParser):
+    """Visible text of a document, whitespace-normalised (style blocks are skipped)"""
+
+    def __init__(self):
+        super().__init__()
+        self.words: List[str] = []
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        self._in_style = tag == "style"
+
+    def handle_endtag(self, tag):
+        self._in_style = False
+
+    def handle_data(self, data):
+        if not self._in_style:
+            self.words.extend(data.split())
+
+
+def visible_text(html: str) -> List[str]:
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    return extractor.words
+
+def best_times(functions: List[Callable], data: Dict[str, Any], repeat: int, rounds: int = 15) -> List[float]:
+    """Best round of each function, in milliseconds per call.
+
+    Rounds of the functions alternate, so a noisy machine slows all of them alike.
+    """
+    best = [float("inf")] * len(functions)
+    for _ in range(rounds):
+        for index, function in enumerate(functions):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                function(data)
+            best[index] = min(best[index], (time.perf_counter() - started) / repeat * 1000)
+    return best
+
+def allocated_kb(function: Callable, data: Dict[str, Any]) -> float:
+    """Peak memory allocated by one call, in KiB"""
+    function(data)
+    tracemalloc.start()
+    function(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+def legacy_render_pdf_bytes(data: Dict[str, Any]) -> bytes:
+    return get_weasyprint().HTML(string=legacy_generate_resume_html(data)).write_pdf()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="Parsed resumes as JSON (default: a built-in sample)")
+    parser.add_argument("--repeat", type=int, default=500, help="Calls per timing round")
+    parser.add_argument("--pdf", action="store_true", help="Also time the full PDF render (needs WeasyPrint)")
+    args = parser.parse_args()
+
+    resumes = []
+    for path in args.files:
+        with open(path) as file:
+            resumes.append((os.path.basename(path), json.load(file)))
+    resumes = resumes or [("sample", SAMPLE_RESUME)]
+
+    mismatches = 0
+    print(f"{'resume':30} {'time old':>10} {'time new':>10} {'alloc old':>10} {'alloc new':>10}")
+    for name, data in resumes:
+        if visible_text(legacy_generate_resume_html(data)) != visible_text(generate_resume_html(data)):
+            print(f"MISMATCH in visible text for {name}")
+            mismatches += 1
+        old_time, new_time = best_times([legacy_generate_resume_html, generate_resume_html], data, args.repeat)
+        print(f"{name[:30]:30} {old_time:9.3f}ms {new_time:9.3f}ms "
+              f"{allocated_kb(legacy_generate_resume_html, data):8.1f}KB {allocated_kb(generate_resume_html, data):8.1f}KB")
+        if args.pdf:
+            old_time, new_time = best_times([legacy_render_pdf_bytes, render_pdf_bytes], data, max(1, args.repeat // 100), rounds=5)
+            print(f"{'  pdf':30} {old_time:9.1f}ms {new_time:9.1f}ms")
+
+    print("identical text" if not mismatches else f"{mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Micro-benchmark for the resume text cleaner and section splitter.
+
+Runs the previous implementations (kept below, verbatim) and the precompiled ones in backend.py
+on the sample resumes in uploads/, checks that both produce identical output and reports the
+time per document.
+
+    python benchmarks/bench_text_cleaning.py [--repeat 200] [files ...]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from backend import clean_resume_text, extract_resume_text, improved_text_splitter
+
+# ======================================================================================================
+#                                   previous implementations (reference)
+# ======================================================================================================
+
+def legacy_text_splitter(text: str) -> List[str]:
+    """Advanced semantic-aware text splitting for resumes with better section recognition"""
+    # Expanded section pattern recognition
+    section_patterns = [
+        r'\n\n(?:INTRODUCTION|ABOUT ME|PROFILE|SUMMARY|PROFESSIONAL SUMMARY)\n\n',
+        r'\n\n(?:WORK EXPERIENCE|PROFESSIONAL EXPERIENCE|EMPLOYMENT HISTORY|WORK HISTORY)\n\n',
+        r'\n\n(?:EDUCATION|ACADEMIC BACKGROUND|EDUCATIONAL QUALIFICATIONS|ACADEMIC QUALIFICATIONS)\n\n',
+        r'\n\n(?:SKILLS|TECHNICAL SKILLS|CORE COMPETENCIES|KEY SKILLS|PROFESSIONAL SKILLS)\n\n',
+        r'\n\n(?:PROJECTS|KEY PROJECTS|PROJECT EXPERIENCE|TECHNICAL PROJECTS)\n\n',
+        r'\n\n(?:CERTIFICATIONS|CERTIFICATES|COURSES|TRAINING|PROFESSIONAL DEVELOPMENT)\n\n',
+        r'\n\n(?:PERSONAL INFORMATION|PERSONAL DETAILS|CONTACT INFORMATION|CONTACT DETAILS)\n\n',
+        r'\n\n(?:HOBBIES|INTERESTS|ACTIVITIES|EXTRACURRICULAR ACTIVITIES)\n\n',
+        r'\n\n(?:ACHIEVEMENTS|AWARDS|HONORS|ACCOMPLISHMENTS|PUBLICATIONS)\n\n',
+        r'\n\n(?:ADDITIONAL INFORMATION|OTHER INFORMATION|MISCELLANEOUS)\n\n',
+        r'\n\n(?:LANGUAGES|LANGUAGE PROFICIENCY)\n\n',
+        r'\n\n(?:VOLUNTEER EXPERIENCE|COMMUNITY SERVICE)\n\n',
+        r'\n\n(?:REFERENCES|PROFESSIONAL REFERENCES)\n\n'
+    ]
+    
+    # Find all section boundaries
+    section_boundaries = []
+    for pattern in section_patterns:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            section_boundaries.append((match.start(), match.end(), match.group().strip()))
+    
+    # Sort boundaries by position
+    section_boundaries.sort(key=lambda x: x[0])
+    
+    # Extract sections based on boundaries
+    sections = []
+    if not section_boundaries:
+        # If no sections found, treat the entire text as one section
+        sections.append(text)
+    else:
+        # Add text before first section if any
+        if section_boundaries[0][0] > 0:
+            sections.append(text[:section_boundaries[0][0]])
+        
+        # Process each section
+        for i, (start, end, header) in enumerate(section_boundaries):
+            # Find end of current section (start of next section or end of text)
+            section_end = section_boundaries[i+1][0] if i < len(section_boundaries)-1 else len(text)
+            sections.append(header + text[end:section_end])
+    
+    # Use more sophisticated content splitter with better preservation of context
+    content_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1100,  # Smaller chunk size for more precise retrieval
+        chunk_overlap=250,  # Larger overlap to maintain context
+        length_function=len,
+        separators=[
+            "\n\n\n",  # Major section breaks
+            "\n\n",     # Paragraph breaks
+            "\n• ", "\n- ", "\n* ", "\n○ ",  # List items
+            ". ", "! ", "? ",  # Sentence boundaries
+            ", ", "; ", " ", ""  # Word boundaries
+        ]
+    )
+    
+    final_chunks = []
+    for section in sections:
+        # Preserve section context in each chunk
+        section_match = re.match(r'^(\n\n[A-Z ]+\n\n)', section)
+        section_header = section_match.group(0) if section_match else ""
+        
+        if section_header:
+            section_content = section[len(section_header):]
+            # Split the content
+            sub_chunks = content_splitter.split_text(section_content)
+            # Add header to each sub-chunk
+            for chunk in sub_chunks:
+                final_chunks.append(section_header + chunk)
+        else:
+            chunks = content_splitter.split_text(section)
+            final_chunks.extend(chunks)
+    
+    return final_chunks
+
+
+def legacy_clean_resume_text(text: str) -> str:
+    """Enhanced text cleaning for resumes with better preprocessing and normalization"""
+    # Convert to plain text if needed (remove any HTML tags)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    
+    # Standardize newlines and whitespace
+    text = re.sub(r'\r\n|\r', '\n', text)  # Standardize line breaks
+    text = re.sub(r'\n{3,}', '\n\n', text)  # Replace excessive newlines
+    text = re.sub(r'[ \t]+', ' ', text)     # Standardize spaces and tabs
+    
+    # Remove control characters and non-printable characters
+    text = re.sub(r'[\x00-\x1F\x7F-\x9F]', '', text)
+    
+    # Remove common resume artifacts, headers, and footers
+    text = re.sub(r'(?i)\b(page\s*\d+|\d+\s*of\s*\d+|confidential|resume|cv|curriculum vitae)\b', '', text)
+    text = re.sub(r'[-_=]{3,}', '', text)  # Remove separator lines
+    
+    # Fix common OCR and formatting issues
+    text = re.sub(r'•', '- ', text)  # Standardize bullet points
+    text = re.sub(r'(\d+)\.(\d+)', r'\1.\2', text)  # Fix merged decimals
+    text = re.sub(r'(\d+)/(\d+)/(\d+)', r'\1/\2/\3', text)  # Fix merged dates
+    
+    # Standardize common section headers with comprehensive patterns
+    section_headers = {
+        r'(?i)\b(introduction|about\s*me|profile|summary|professional\s*summary)\b': 'INTRODUCTION',
+        r'(?i)\b(work\s*history|employment\s*history|professional\s*experience|work\s*experience)\b': 'WORK EXPERIENCE',
+        r'(?i)\b(education|academic\s*background|educational\s*qualifications)\b': 'EDUCATION',
+        r'(?i)\b(skills|technical\s*skills|core\s*competencies|key\s*skills)\b': 'SKILLS',
+        r'(?i)\b(personal\s*details?|personal\s*information|contact\s*details?|contact\s*information)\b': 'PERSONAL INFORMATION',
+        r'(?i)\b(projects|key\s*projects|project\s*experience|technical\s*projects)\b': 'PROJECTS',
+        r'(?i)\b(certifications|certificates|professional\s*development|courses|training)\b': 'CERTIFICATIONS',
+        r'(?i)\b(hobbies|interests|activities|extracurricular\s*activities)\b': 'HOBBIES',
+        r'(?i)\b(achievements|awards|honors|accomplishments|publications)\b': 'ACHIEVEMENTS',
+        r'(?i)\b(additional\s*information|other\s*information|miscellaneous)\b': 'ADDITIONAL INFORMATION',
+        r'(?i)\b(languages|language\s*proficiency)\b': 'LANGUAGES',
+        r'(?i)\b(volunteer\s*experience|community\s*service)\b': 'VOLUNTEER EXPERIENCE',
+        r'(?i)\b(references|professional\s*references)\b': 'REFERENCES',
+    }
+    
+    for pattern, replacement in section_headers.items():
+        text = re.sub(pattern, f'\n\n{replacement}\n\n', text)
+    
+    return text.strip()
+
+
+# ======================================================================================================
+#                                               benchmark
+# ======================================================================================================
+
+def best_time(function, text: str, repeat: int) -> float:
+    """Best of five rounds, in milliseconds per call"""
+    rounds = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function(text)
+        rounds.append((time.perf_counter() - started) / repeat * 1000)
+    return min(rounds)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="Resumes to use (default: uploads/*.pdf, uploads/*.docx)")
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per timing round")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    files = args.files or sorted(glob.glob(os.path.join(root, "uploads", "*.pdf")) + glob.glob(os.path.join(root, "uploads", "*.docx")))
+
+    mismatches = 0
+    print(f"{'file':45} {'chars':>7} {'clean old':>10} {'clean new':>10} {'split old':>10} {'split new':>10}")
+    for path in files:
+        with open(path, "rb") as file:
+            text = extract_resume_text(os.path.basename(path), file)
+
+        cleaned = clean_resume_text(text)
+        if cleaned != legacy_clean_resume_text(text):
+            print(f"MISMATCH in clean_resume_text for {path}")
+            mismatches += 1
+        if improved_text_splitter(cleaned) != legacy_text_splitter(cleaned):
+            print(f"MISMATCH in improved_text_splitter for {path}")
+            mismatches += 1
+
+        print(f"{os.path.basename(path)[:45]:45} {len(text):7d} "
+              f"{best_time(legacy_clean_resume_text, text, args.repeat):9.3f}ms {best_time(clean_resume_text, text, args.repeat):9.3f}ms "
+              f"{best_time(legacy_text_splitter, cleaned, args.repeat):9.3f}ms {best_time(improved_text_splitter, cleaned, args.repeat):9.3f}ms")
+
+    print("identical output" if not mismatches else f"{mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import argparse
+import io
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from backend import (
+    SUPPORTED_RESUME_EXTENSIONS,
+    extract_resume_text,
+    fn_Resume_cached,
+    prefetch_resume_embeddings,
+    save_parsed_resume,
+    serialize_pydantic_model,
+)
+
+bulk_logger = logging.getLogger('bulk')
+
+# ======================================================================================================
+#                                       bulk ingestion configuration
+# ======================================================================================================
+
+# Number of resumes parsed at the same time (each one also runs its sections concurrently)
+BULK_WORKERS = int(os.getenv("BULK_WORKERS", "4"))
+# Largest single resume accepted from a zip archive or directory
+BULK_MAX_FILE_BYTES = int(os.getenv("BULK_MAX_FILE_BYTES", str(16 * 1024 * 1024)))
+# Largest request accepted by /parse_resumes/bulk (the rest of the API keeps its 16MB limit)
+BULK_MAX_UPLOAD_BYTES = int(os.getenv("BULK_MAX_UPLOAD_BYTES", str(512 * 1024 * 1024)))
+# Limits on the files inside uploaded zip archives, checked against the archive directory before
+# anything is parsed (a small zip can expand to gigabytes)
+BULK_MAX_ZIP_MEMBERS = int(os.getenv("BULK_MAX_ZIP_MEMBERS", "5000"))
+BULK_MAX_UNCOMPRESSED_BYTES = int(os.getenv("BULK_MAX_UNCOMPRESSED_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Files extracted (and their chunk embeddings requested) together, while earlier ones are parsed
+BULK_PREFETCH_WINDOW = int(os.getenv("BULK_PREFETCH_WINDOW", "16"))
+
+# ======================================================================================================
+#                                       resume sources
+# ======================================================================================================
+
+def is_resume_file(filename: str) -> bool:
+    return filename.rsplit('.', 1)[-1].lower() in SUPPORTED_RESUME_EXTENSIONS
+
+class UploadTooLarge(ValueError):
+    """Raised when uploaded zip archives would expand beyond the bulk ingestion limits"""
+
+def check_archives(files: Iterable[Tuple[str, BinaryIO]]) -> None:
+    """Reject zip archives whose central directories exceed the member or uncompressed size limits.
+
+    Only the directory at the end of each archive is read; file positions are left for iter_zip.
+    """
+    members = uncompressed = 0
+    for filename, file in files:
+        if not filename.lower().endswith('.zip'):
+            continue
+        with zipfile.ZipFile(file) as archive:
+            for member in archive.infolist():
+                if member.is_dir():
+                    continue
+                members += 1
+                uncompressed += member.file_size
+        if members > BULK_MAX_ZIP_MEMBERS:
+            raise UploadTooLarge(f"Zip archives hold more than {BULK_MAX_ZIP_MEMBERS} files")
+        if uncompressed > BULK_MAX_UNCOMPRESSED_BYTES:
+            raise UploadTooLarge(f"Zip archives expand to more than {BULK_MAX_UNCOMPRESSED_BYTES} bytes")
+
+def iter_zip(file: BinaryIO) -> Iterator[Tuple[str, bytes]]:
+    """Yield (filename, content) for every resume inside a zip archive, reading one member at a time"""
+    with zipfile.ZipFile(file) as archive:
+        for member in archive.infolist():
+            filename = os.path.basename(member.filename)
+            if member.is_dir() or not filename or not is_resume_file(filename):
+                continue
+            if member.file_size > BULK_MAX_FILE_BYTES:
+                bulk_logger.warning(f"Skipping {filename}: {member.file_size} bytes exceeds the file limit")
+                continue
+            # The header size is not trusted: stop reading one byte past the limit
+            with archive.open(member) as member_file:
+                data = member_file.read(BULK_MAX_FILE_BYTES + 1)
+            if len(data) > BULK_MAX_FILE_BYTES:
+                bulk_logger.warning(f"Skipping {filename}: content exceeds the file limit")
+                continue
+            yield filename, data
+
+def iter_directory(directory: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield (filename, content) for every resume directly inside a directory"""
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path) or not is_resume_file(filename):
+            continue
+        if os.path.getsize(path) > BULK_MAX_FILE_BYTES:
+            bulk_logger.warning(f"Skipping {filename}: file exceeds the size limit")
+            continue
+        with open(path, 'rb') as file:
+            yield filename, file.read()
+
+def iter_sources(files: Iterable[Tuple[str, BinaryIO]]) -> Iterator[Tuple[str, bytes]]:
+    """Expand zip archives among (filename, file object) pairs and read resumes as they are consumed"""
+    for filename, file in files:
+        if filename.lower().endswith('.zip'):
+            yield from iter_zip(file)
+        else:
+            yield filename, file.read()
+
+def iter_paths(paths: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """Resume sources from command line paths: files, zip archives or directories"""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from iter_directory(path)
+        else:
+            with open(path, 'rb') as file:
+                yield from iter_sources([(os.path.basename(path), file)])
+
+# ======================================================================================================
+#                                       bulk ingestion pipeline
+# ======================================================================================================
+
+def parse_and_save(filename: str, resume_text: str) -> Dict:
+    """Parse one extracted resume and store it; errors are returned, never raised"""
+    started = time.perf_counter()
+    try:
+        structured_data = fn_Resume_cached(resume_text, filename=filename)
+        if not structured_data or "error" in structured_data:
+            raise ValueError(structured_data.get("error", "Resume could not be parsed"))
+        save_parsed_resume(structured_data, resume_text, filename)
+        classification = serialize_pydantic_model(structured_data.get("Classification"))
+        category = classification.get("category") if isinstance(classification, dict) else None
+        return {"filename": filename, "status": "parsed", "category": category,
+                "seconds": round(time.perf_counter() - started, 2)}
+    except Exception as e:
+        bulk_logger.error(f"Failed to ingest {filename}: {str(e)}")
+        return {"filename": filename, "status": "error", "error": str(e),
+                "seconds": round(time.perf_counter() - started, 2)}
+
+def extract_for_ingest(filename: str, data: bytes) -> str:
+    resume_text = extract_resume_text(filename, io.BytesIO(data))
+    if not resume_text[len(filename):].strip():
+        raise ValueError("Could not extract text from file")
+    return resume_text
+
+def ingest_many(sources: Iterable[Tuple[str, bytes]], workers: int = BULK_WORKERS) -> Iterator[Dict]:
+    """Parse many resumes on a bounded thread pool, yielding an event per extracted and per finished file.
+
+    Sources are consumed in windows of BULK_PREFETCH_WINDOW files: a window is extracted (one
+    ``extracted`` event per file), its chunk embeddings are requested in shared batches and its
+    resumes are queued for the LLM extraction, which runs with at most ``workers`` resumes in
+    flight. The next window is extracted while the queued ones are parsed, so progress starts
+    with the first file and at most about two windows of resume text are held at once.
+    """
+    sources = iter(sources)
+    window_size = max(1, BULK_PREFETCH_WINDOW)
+    extracted = completed = 0
+    pending = set()
+
+    def progress(futures) -> Iterator[Dict]:
+        nonlocal completed
+        for future in futures:
+            pending.discard(future)
+            completed += 1
+            yield {"event": "progress", "completed": completed, "extracted": extracted, "result": future.result()}
+
+    bulk_logger.info(f"Bulk ingestion with {workers} workers")
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="bulk") as executor:
+        while True:
+            window = list(itertools.islice(sources, window_size))
+            if not window:
+                break
+            texts = []
+            for filename, data in window:
+                extracted += 1
+                try:
+                    texts.append((filename, extract_for_ingest(filename, data)))
+                    yield {"event": "extracted", "filename": filename, "extracted": extracted}
+                except Exception as e:
+                    completed += 1
+                    result = {"filename": filename, "status": "error", "error": str(e), "seconds": 0.0}
+                    yield {"event": "progress", "completed": completed, "extracted": extracted, "result": result}
+                yield from progress([future for future in list(pending) if future.done()])
+            del window
+
+            try:
+                prefetch_resume_embeddings([resume_text for _, resume_text in texts])
+            except Exception as e:
+                bulk_logger.warning(f"Embedding prefetch failed, resumes will be embedded individually: {str(e)}")
+            pending.update(executor.submit(parse_and_save, filename, resume_text) for filename, resume_text in texts)
+
+            # Keep one window queued behind the workers, no more
+            while len(pending) > window_size:
+                yield from progress(wait(pending, return_when=FIRST_COMPLETED).done)
+
+        while pending:
+            yield from progress(wait(pending, return_when=FIRST_COMPLETED).done)
+
+    bulk_logger.info(f"Bulk ingestion finished: {completed} files processed")
+
+def summarize(results: List[Dict]) -> Dict:
+    return {
+        "event": "done",
+        "total": len(results),
+        "parsed": sum(1 for result in results if result["status"] == "parsed"),
+        "failed": sum(1 for result in results if result["status"] != "parsed"),
+    }
+
+def stream_ingestion(sources: Iterable[Tuple[str, bytes]], workers: int = BULK_WORKERS) -> Iterator[str]:
+    """JSON lines for every progress event, followed by a summary line"""
+    results = []
+    for event in ingest_many(sources, workers):
+        if event["event"] == "progress":
+            results.append(event["result"])
+        yield json.dumps(event) + "\n"
+    yield json.dumps(summarize(results)) + "\n"
+
+# ======================================================================================================
+#                                       command line entry point
+# ======================================================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse many resumes (files, zip archives or directories) into MongoDB.")
+    parser.add_argument("paths", nargs="+", help="Resume files, zip archives or directories such as uploads/")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS, help="Resumes parsed at the same time")
+    args = parser.parse_args(argv)
+
+    line = ""
+    for line in stream_ingestion(iter_paths(args.paths), args.workers):
+        sys.stdout.write(line)
+        sys.stdout.flush()
+    return 1 if json.loads(line)["failed"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+cache_logger = logging.getLogger('cache')
+
+# ======================================================================================================
+#                                           cache helpers
+# ======================================================================================================
+
+def content_hash(*parts: str) -> str:
+    """Stable SHA-256 key for a sequence of text parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")  # separator so ("ab", "c") and ("a", "bc") differ
+    return digest.hexdigest()
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters shared by all cache tiers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+# ======================================================================================================
+#                                       in-process LRU cache
+# ======================================================================================================
+
+class LRUCache:
+    """Bounded in-memory cache that evicts the least recently used entry"""
+
+    def __init__(self, name: str, max_entries: int):
+        self.name = name
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        self.stats.record(value is not None)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def info(self) -> Dict[str, Any]:
+        return {**self.stats.as_dict(), "size": len(self), "max_entries": self.max_entries}
+
+# ======================================================================================================
+#                                       MongoDB backed cache
+# ======================================================================================================
+
+class MongoCache:
+    """Persistent key/value cache stored in a MongoDB collection.
+
+    Entries expire through a TTL index on ``created_at``. When the collection grows past
+    ``max_entries`` the least recently used entries are removed. Any database error is
+    logged and treated as a miss so the cache can never break the caller.
+    """
+
+    def __init__(self, get_collection: Callable, name: str, ttl_seconds: int, max_entries: int,
+                 evict_every: int = 100):
+        self._get_collection = get_collection
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.stats = CacheStats()
+        self._indexes_ready = False
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _collection(self):
+        collection = self._get_collection()
+        if not self._indexes_ready:
+            self._ensure_ttl_index(collection)
+            collection.create_index("last_access")
+            self._indexes_ready = True
+        return collection
+
+    def _ensure_ttl_index(self, collection) -> None:
+        """TTL index on created_at; one left by an earlier ttl_seconds is changed in place"""
+        from pymongo.errors import OperationFailure
+        try:
+            collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+        except OperationFailure as e:
+            if e.code != 85:  # IndexOptionsConflict: same key, other expireAfterSeconds
+                raise
+            cache_logger.info(f"{self.name} cache TTL changed, setting created_at expiry to {self.ttl_seconds}s")
+            collection.database.command("collMod", collection.name, index={
+                "keyPattern": {"created_at": 1},
+                "expireAfterSeconds": self.ttl_seconds,
+            })
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            now = datetime.now()
+            entry = self._collection().find_one_and_update(
+                {"_id": key, "created_at": {"$gt": now - timedelta(seconds=self.ttl_seconds)}},
+                {"$set": {"last_access": now}, "$inc": {"hit_count": 1}},
+            )
+        except Exception as e:
+            cache_logger.error(f"{self.name} cache lookup failed: {str(e)}")
+            entry = None
+
+        self.stats.record(entry is not None)
+        if entry is None:
+            cache_logger.info(f"{self.name} cache miss for {key[:12]}")
+            return None
+        cache_logger.info(f"{self.name} cache hit for {key[:12]}")
+        return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            now = datetime.now()
+            self._collection().replace_one(
+                {"_id": key},
+                {"value": value, "created_at": now, "last_access": now, "hit_count": 0},
+                upsert=True,
+            )
+            with self._lock:
+                self._writes += 1
+                should_evict = self._writes % self.evict_every == 0
+            if should_evict:
+                self.evict()
+        except Exception as e:
+            cache_logger.error(f"{self.name} cache write failed: {str(e)}")
+
+    def evict(self) -> int:
+        """Remove the least recently used entries above ``max_entries``"""
+        collection = self._collection()
+        overflow = collection.estimated_document_count() - self.max_entries
+        if overflow <= 0:
+            return 0
+        stale = [doc["_id"] for doc in collection.find({}, {"_id": 1}).sort("last_access", 1).limit(overflow)]
+        result = collection.delete_many({"_id": {"$in": stale}})
+        cache_logger.info(f"Evicted {result.deleted_count} entries from {self.name} cache")
+        return result.deleted_count
+
+    def info(self) -> Dict[str, Any]:
+        return {**self.stats.as_dict(), "ttl_seconds": self.ttl_seconds, "max_entries": self.max_entries}
+
+# ======================================================================================================
+#                                       local SQLite backed cache
+# ======================================================================================================
+
+class SQLiteCache:
+    """Persistent on-disk bytes cache in a single SQLite file.
+
+    Used where a MongoDB round trip would cost more than the value is worth (e.g. embedding
+    vectors). The least recently used entries above ``max_entries`` are evicted periodically.
+    """
+
+    def __init__(self, path: str, name: str, max_entries: int, evict_every: int = 200):
+        self.path = path
+        self.name = name
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.stats = CacheStats()
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                    self._conn.commit()
+        except sqlite3.Error as e:
+            cache_logger.error(f"{self.name} disk cache lookup failed: {str(e)}")
+            row = None
+        self.stats.record(row is not None)
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: bytes) -> None:
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, last_access) VALUES (?, ?, ?)",
+                    (key, value, time.time()),
+                )
+                self._conn.commit()
+                self._writes += 1
+                if self._writes % self.evict_every == 0:
+                    self._evict_locked()
+        except sqlite3.Error as e:
+            cache_logger.error(f"{self.name} disk cache write failed: {str(e)}")
+
+    def _evict_locked(self) -> None:
+        self._conn.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def info(self) -> Dict[str, Any]:
+        return {**self.stats.as_dict(), "path": self.path, "max_entries": self.max_entries}
@@ -0,0 +1,238 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+
+from repository import FINGERPRINTS_COLLECTION, VERSIONS_COLLECTION, resume_repository
+from resources import get_db
+
+dedup_logger = logging.getLogger('dedup')
+
+# ======================================================================================================
+#                                       deduplication configuration
+# ======================================================================================================
+
+# upsert: a re-submitted candidate replaces the stored parse, the previous one becomes a version
+# link:   the stored parse is kept and the new parse is attached to it as a version
+# off:    every resume is inserted as a new record (previous behaviour)
+DEDUP_MODE = os.getenv("DEDUP_MODE", "upsert")
+# Names alone are not unique, so they only identify a candidate when explicitly enabled
+DEDUP_MATCH_ON_NAME = os.getenv("DEDUP_MATCH_ON_NAME", "0") == "1"
+# Shortest phone number (in digits) that is trusted as an identifier
+MIN_PHONE_DIGITS = 7
+FINGERPRINT_WRITE_BATCH = 1000
+
+# Lookup order when several fingerprints of one resume point to different candidates
+FINGERPRINT_PRIORITY = ("email", "phone", "name")
+
+# ======================================================================================================
+#                                       fingerprints
+# ======================================================================================================
+
+def normalize_email(value: Optional[str]) -> Optional[str]:
+    """Lower-cased address without a +tag in the local part"""
+    if not value or "@" not in value:
+        return None
+    local, _, domain = value.strip().lower().rpartition("@")
+    local = local.split("+", 1)[0]
+    return f"{local}@{domain}" if local and "." in domain else None
+
+def normalize_phone(value: Optional[str]) -> Optional[str]:
+    """Last ten digits, so numbers with and without a country code match"""
+    digits = re.sub(r"\D", "", value or "")
+    return digits[-10:] if len(digits) >= MIN_PHONE_DIGITS else None
+
+def normalize_name(value: Optional[str]) -> Optional[str]:
+    """Accent-free, lower-cased name tokens in sorted order ("Doe, John" == "john doe")"""
+    ascii_name = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii")
+    tokens = sorted(re.findall(r"[a-z]+", ascii_name.lower()))
+    return " ".join(tokens) if tokens else None
+
+def candidate_fingerprints(personal_details: Optional[Dict[str, Any]]) -> List[str]:
+    """Fingerprint keys such as ``email:jane@x.com`` for the Personal_Details of a resume"""
+    personal_details = personal_details or {}
+    values = {
+        "email": normalize_email(personal_details.get("Email_Address")),
+        "phone": normalize_phone(personal_details.get("Phone_Number")),
+        "name": normalize_name(personal_details.get("Full_Name")),
+    }
+    return [f"{kind}:{values[kind]}" for kind in FINGERPRINT_PRIORITY if values[kind]]
+
+def matching_fingerprints(fingerprints: List[str]) -> List[str]:
+    return [key for key in fingerprints if DEDUP_MATCH_ON_NAME or not key.startswith("name:")]
+
+def find_candidate(fingerprints: List[str]) -> Optional[ObjectId]:
+    """Resume id already registered for one of the fingerprints, strongest fingerprint first"""
+    keys = matching_fingerprints(fingerprints)
+    if not keys:
+        return None
+    owners = {doc["_id"]: doc["resume_id"] for doc in get_db()[FINGERPRINTS_COLLECTION].find({"_id": {"$in": keys}})}
+    for key in keys:
+        if key in owners:
+            return owners[key]
+    return None
+
+def register_fingerprints(assignments: Dict[str, ObjectId]) -> None:
+    """Point each fingerprint key at its resume id"""
+    now = datetime.now().isoformat()
+    operations = [
+        UpdateOne({"_id": key}, {"$set": {"resume_id": resume_id, "updated_at": now}}, upsert=True)
+        for key, resume_id in assignments.items()
+    ]
+    for start in range(0, len(operations), FINGERPRINT_WRITE_BATCH):
+        get_db()[FINGERPRINTS_COLLECTION].bulk_write(operations[start:start + FINGERPRINT_WRITE_BATCH], ordered=False)
+
+def archive_version(resume_id: ObjectId, resume_record: Dict[str, Any]) -> None:
+    version = {key: value for key, value in resume_record.items() if key not in ("_id", "version_count")}
+    version.update({"resume_id": resume_id, "source_id": resume_record.get("_id"), "archived_at": datetime.now().isoformat()})
+    get_db()[VERSIONS_COLLECTION].insert_one(version)
+
+# ======================================================================================================
+#                                       deduplicating ingest
+# ======================================================================================================
+
+def save_resume_record(resume_record: Dict[str, Any]) -> ObjectId:
+    """Store a parsed resume, merging it into an existing record of the same candidate.
+
+    Two uploads of a new candidate racing each other can still both be inserted; the next
+    ``merge_duplicates`` run folds them together.
+    """
+    if DEDUP_MODE == "off":
+        return resume_repository.insert_resume(resume_record)
+
+    fingerprints = candidate_fingerprints(resume_record.get("parsed_data", {}).get("Personal_Details"))
+    existing_id = find_candidate(fingerprints)
+    existing = resume_repository.get_resume(existing_id) if existing_id is not None else None
+
+    if existing is None:
+        resume_id = resume_repository.insert_resume(resume_record)
+    elif DEDUP_MODE == "link":
+        resume_id = existing_id
+        archive_version(resume_id, resume_record)
+        # upload_date marks the latest submission, so latest_resume() finds this candidate
+        resume_repository.collection.update_one(
+            {"_id": resume_id},
+            {"$inc": {"version_count": 1}, "$set": {"upload_date": resume_record.get("upload_date")}},
+        )
+        dedup_logger.info(f"Linked {resume_record.get('filename')} as a version of resume {resume_id}")
+    else:
+        resume_id = existing_id
+        archive_version(resume_id, existing)
+        resume_repository.replace_resume(resume_id, {**resume_record, "version_count": existing.get("version_count", 1) + 1})
+        dedup_logger.info(f"Updated resume {resume_id} with {resume_record.get('filename')}")
+
+    resume_record["_id"] = resume_id
+    register_fingerprints({key: resume_id for key in fingerprints})
+    return resume_id
+
+# ======================================================================================================
+#                                       batch deduplication of stored resumes
+# ======================================================================================================
+
+def merge_group(resume_ids: List[ObjectId]) -> None:
+    """Fold a group of duplicate resumes into the oldest id, archiving the others as versions.
+
+    The most recent upload (by upload_date, then _id) is the current version: its parse becomes
+    the content in upsert mode and its date the group's upload_date in both modes.
+    """
+    canonical_id = resume_ids[0]
+    documents = {doc["_id"]: doc for doc in resume_repository.collection.find({"_id": {"$in": resume_ids}})}
+    newest_id = max(resume_ids, key=lambda resume_id: (documents[resume_id].get("upload_date") or "", resume_id))
+    canonical = documents[canonical_id]
+    duplicates = resume_ids[1:]
+    if DEDUP_MODE == "upsert":
+        # The oldest id is kept, but with the most recent parse as its content
+        if newest_id != canonical_id:
+            archive_version(canonical_id, canonical)
+        resume_repository.replace_resume(canonical_id, {**documents[newest_id], "version_count": len(resume_ids)})
+        duplicates = [resume_id for resume_id in resume_ids[1:] if resume_id != newest_id]
+    else:
+        resume_repository.collection.update_one(
+            {"_id": canonical_id},
+            {"$set": {"version_count": len(resume_ids), "upload_date": documents[newest_id].get("upload_date") or canonical.get("upload_date")}},
+        )
+    for duplicate_id in duplicates:
+        archive_version(canonical_id, documents[duplicate_id])
+    get_db()[VERSIONS_COLLECTION].update_many({"resume_id": {"$in": resume_ids[1:]}}, {"$set": {"resume_id": canonical_id}})
+    resume_repository.collection.delete_many({"_id": {"$in": resume_ids[1:]}})
+
+def merge_duplicates(dry_run: bool = False) -> Dict[str, Any]:
+    """Find candidates stored more than once and merge them, then rebuild the fingerprint index.
+
+    Resumes are grouped transitively: two records sharing an email, and one of them sharing a
+    phone number with a third, all end up in the same group.
+    """
+    parent: Dict[ObjectId, ObjectId] = {}
+
+    def root(resume_id: ObjectId) -> ObjectId:
+        while parent[resume_id] != resume_id:
+            parent[resume_id] = parent[parent[resume_id]]
+            resume_id = parent[resume_id]
+        return resume_id
+
+    fingerprint_owner: Dict[str, ObjectId] = {}
+    resume_fingerprints: Dict[ObjectId, List[str]] = {}
+    for document in resume_repository.find_page(fields=["parsed_data.Personal_Details"]):
+        resume_id = document["_id"]
+        parent[resume_id] = resume_id
+        fingerprints = candidate_fingerprints(document.get("parsed_data", {}).get("Personal_Details"))
+        resume_fingerprints[resume_id] = fingerprints
+        for key in matching_fingerprints(fingerprints):
+            if key in fingerprint_owner:
+                # Older resumes (smaller ids) always stay the root of their group
+                first, second = sorted((root(fingerprint_owner[key]), root(resume_id)))
+                parent[second] = first
+            else:
+                fingerprint_owner[key] = resume_id
+
+    groups: Dict[ObjectId, List[ObjectId]] = {}
+    for resume_id in parent:
+        groups.setdefault(root(resume_id), []).append(resume_id)
+    duplicate_groups = [sorted(ids) for ids in groups.values() if len(ids) > 1]
+    report = {
+        "scanned": len(parent),
+        "duplicate_groups": len(duplicate_groups),
+        "duplicate_resumes": sum(len(ids) - 1 for ids in duplicate_groups),
+        "dry_run": dry_run,
+    }
+    if dry_run:
+        return report
+
+    for resume_ids in duplicate_groups:
+        merge_group(resume_ids)
+    register_fingerprints({
+        key: root(resume_id)
+        for resume_id, fingerprints in resume_fingerprints.items()
+        for key in fingerprints
+    })
+    dedup_logger.info(f"Merged {report['duplicate_resumes']} duplicate resumes into {report['duplicate_groups']} candidates")
+    return report
+
+# ======================================================================================================
+#                                       command line entry point
+# ======================================================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge resumes stored more than once for the same candidate.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many duplicates would be merged")
+    args = parser.parse_args(argv)
+    json.dump(merge_duplicates(dry_run=args.dry_run), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,318 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from resources import get_db
+
+email_logger = logging.getLogger('email_dispatch')
+
+# ======================================================================================================
+#                                       email dispatch configuration
+# ======================================================================================================
+
+# Point at a local stub (see ``python email_dispatch.py stub``) to test without sending mail
+POSTMARK_API_URL = os.getenv("POSTMARK_API_URL", "https://api.postmarkapp.com").rstrip("/")
+POSTMARK_SERVER_TOKEN = os.getenv("SERVER_TOKEN")
+EMAIL_FROM = os.getenv("EMAIL_FROM", "hopefulroentgen@justzeus.com")
+EMAIL_MESSAGE_STREAM = os.getenv("EMAIL_MESSAGE_STREAM", "broadcast")
+# Postmark accepts at most 500 messages per batch call
+EMAIL_BATCH_SIZE = min(int(os.getenv("EMAIL_BATCH_SIZE", "500")), 500)
+# Batch calls in flight at the same time, shared by all dispatches
+EMAIL_SEND_WORKERS = int(os.getenv("EMAIL_SEND_WORKERS", "4"))
+# Token bucket: sustained batch calls per second and the burst allowed on top
+EMAIL_RATE_PER_SECOND = float(os.getenv("EMAIL_RATE_PER_SECOND", "5"))
+EMAIL_RATE_BURST = int(os.getenv("EMAIL_RATE_BURST", "10"))
+EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", "4"))
+EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", "1.0"))
+EMAIL_REQUEST_TIMEOUT = float(os.getenv("EMAIL_REQUEST_TIMEOUT", "30"))
+EMAIL_MAX_RECIPIENTS = int(os.getenv("EMAIL_MAX_RECIPIENTS", "10000"))
+
+DISPATCHES_COLLECTION = "email_dispatches"
+# Answers that prove the batch was not accepted, so it can be sent again. Any other 5xx (and
+# a timeout while waiting for the answer) may come after Postmark queued the messages.
+RETRY_STATUS_CODES = {429, 503}
+
+# ======================================================================================================
+#                                       rate limiting
+# ======================================================================================================
+
+class TokenBucket:
+    """Blocking token bucket shared by all sender threads"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+rate_limiter = TokenBucket(EMAIL_RATE_PER_SECOND, EMAIL_RATE_BURST)
+
+# ======================================================================================================
+#                                       Postmark batch calls
+# ======================================================================================================
+
+_sessions = threading.local()
+
+def _session() -> requests.Session:
+    """One keep-alive HTTP session per sender thread"""
+    if not hasattr(_sessions, "session"):
+        session = requests.Session()
+        session.headers.update({
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "X-Postmark-Server-Token": POSTMARK_SERVER_TOKEN or "",
+        })
+        _sessions.session = session
+    return _sessions.session
+
+def build_messages(recipients: List[str], subject: str, html: Optional[str] = None, text: Optional[str] = None) -> List[Dict[str, Any]]:
+    """One message per recipient, so nobody sees the other addresses"""
+    body = {key: value for key, value in (("HtmlBody", html), ("TextBody", text)) if value}
+    return [
+        {"From": EMAIL_FROM, "To": recipient, "Subject": subject, "MessageStream": EMAIL_MESSAGE_STREAM, **body}
+        for recipient in recipients
+    ]
+
+def _retry_delay(attempt: int, response: Optional[requests.Response] = None) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return EMAIL_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+def _not_sent(error: requests.RequestException) -> bool:
+    """True when the request provably never reached Postmark (no connection was made)"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    return isinstance(reason, MaxRetryError) and isinstance(reason.reason, NewConnectionError)
+
+def send_batch(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Send up to EMAIL_BATCH_SIZE messages in one call and return the status of each recipient.
+
+    Only failures that prove the batch was not delivered (no connection, 429, 503) are retried,
+    with exponential backoff. After a read timeout or another 5xx the messages may already be
+    on their way, so the recipients are reported as ``unknown`` instead of being mailed twice.
+    A message Postmark rejects (non-zero ErrorCode) is reported as failed.
+    """
+    error, response = None, None
+    for attempt in range(EMAIL_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(_retry_delay(attempt - 1, response))
+        rate_limiter.acquire()
+        try:
+            response = _session().post(f"{POSTMARK_API_URL}/email/batch", json=messages, timeout=EMAIL_REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            error, response = str(e), None
+            if not _not_sent(e):
+                return _batch_status(messages, "unknown", error)
+            email_logger.warning(f"Batch of {len(messages)} emails failed (attempt {attempt + 1}): {error}")
+            continue
+        error = f"HTTP {response.status_code}: {response.text[:200]}"
+        if response.status_code in RETRY_STATUS_CODES:
+            email_logger.warning(f"Batch of {len(messages)} emails failed (attempt {attempt + 1}): {error}")
+            continue
+        if response.status_code >= 500:
+            return _batch_status(messages, "unknown", error)
+        if response.status_code != 200:
+            break
+        try:
+            results = response.json()
+        except ValueError:
+            return _batch_status(messages, "unknown", f"Unreadable batch response: {response.text[:200]}")
+        return [
+            {
+                "email": message["To"],
+                "status": "sent" if result.get("ErrorCode") == 0 else "failed",
+                "message": result.get("Message", ""),
+                "message_id": result.get("MessageID"),
+            }
+            for message, result in zip(messages, results)
+        ]
+    return _batch_status(messages, "error", error)
+
+def _batch_status(messages: List[Dict[str, Any]], status: str, error: str) -> List[Dict[str, Any]]:
+    if status == "unknown":
+        email_logger.error(f"Delivery of a batch of {len(messages)} emails is unknown, not resending: {error}")
+    else:
+        email_logger.error(f"Giving up on a batch of {len(messages)} emails: {error}")
+    return [{"email": message["To"], "status": status, "error": error} for message in messages]
+
+# ======================================================================================================
+#                                       dispatches
+# ======================================================================================================
+
+_send_executor = ThreadPoolExecutor(max_workers=max(1, EMAIL_SEND_WORKERS), thread_name_prefix="email-send")
+# Runs asynchronous dispatches; their batches still go through the shared sender pool
+_dispatch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="email-dispatch")
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+def validate_recipients(recipients: Any) -> List[str]:
+    """Distinct recipient addresses in their original order; raises ValueError on bad input"""
+    if not isinstance(recipients, list) or not all(isinstance(recipient, str) for recipient in recipients):
+        raise ValueError("recipients must be a list of email addresses")
+    recipients = list(dict.fromkeys(recipient.strip() for recipient in recipients if recipient.strip()))
+    if not recipients:
+        raise ValueError("No recipients provided")
+    if len(recipients) > EMAIL_MAX_RECIPIENTS:
+        raise ValueError(f"At most {EMAIL_MAX_RECIPIENTS} recipients can be sent to at once")
+    return recipients
+
+def send_emails(recipients: List[str], subject: str, html: Optional[str] = None, text: Optional[str] = None,
+                dispatch_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Send one email per recipient in concurrent batch calls and return per-recipient status.
+
+    With ``dispatch_id`` the results of every batch are added to that dispatch as it finishes.
+    """
+    messages = build_messages(recipients, subject, html, text)
+    batches = [messages[start:start + EMAIL_BATCH_SIZE] for start in range(0, len(messages), EMAIL_BATCH_SIZE)]
+    email_logger.info(f"Sending {len(messages)} emails in {len(batches)} batches")
+
+    def send(batch):
+        results = send_batch(batch)
+        if dispatch_id is not None:
+            sent = sum(1 for result in results if result["status"] == "sent")
+            unknown = sum(1 for result in results if result["status"] == "unknown")
+            get_db()[DISPATCHES_COLLECTION].update_one({"_id": dispatch_id}, {
+                "$push": {"results": {"$each": results}},
+                "$inc": {"sent": sent, "unknown": unknown, "failed": len(results) - sent - unknown},
+                "$set": {"updated_at": _now()},
+            })
+        return results
+
+    return [result for results in _send_executor.map(send, batches) for result in results]
+
+def _run_dispatch(dispatch_id: str, recipients: List[str], subject: str, html: Optional[str], text: Optional[str]) -> None:
+    collection = get_db()[DISPATCHES_COLLECTION]
+    collection.update_one({"_id": dispatch_id}, {"$set": {"status": "running", "updated_at": _now()}})
+    try:
+        send_emails(recipients, subject, html, text, dispatch_id=dispatch_id)
+        collection.update_one({"_id": dispatch_id}, {"$set": {"status": "done", "updated_at": _now()}})
+    except Exception as e:
+        email_logger.error(f"Email dispatch {dispatch_id} failed: {str(e)}")
+        collection.update_one({"_id": dispatch_id}, {"$set": {"status": "failed", "error": str(e), "updated_at": _now()}})
+
+def submit_dispatch(recipients: List[str], subject: str, html: Optional[str] = None, text: Optional[str] = None) -> str:
+    """Queue the emails for sending in the background and return the dispatch id"""
+    dispatch_id = uuid.uuid4().hex
+    get_db()[DISPATCHES_COLLECTION].insert_one({
+        "_id": dispatch_id,
+        "subject": subject,
+        "status": "queued",
+        "total": len(recipients),
+        "sent": 0,
+        "failed": 0,
+        "unknown": 0,
+        "results": [],
+        "created_at": _now(),
+        "updated_at": _now(),
+    })
+    _dispatch_executor.submit(_run_dispatch, dispatch_id, recipients, subject, html, text)
+    return dispatch_id
+
+def get_dispatch(dispatch_id: str) -> Optional[Dict[str, Any]]:
+    return get_db()[DISPATCHES_COLLECTION].find_one({"_id": dispatch_id})
+
+# ======================================================================================================
+#                                       local Postmark stub
+# ======================================================================================================
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers POST /email/batch like Postmark; ``fail_rate`` of the calls get a 429 and every
+    answer is sent after ``delay`` seconds (to exercise client timeouts)"""
+
+    fail_rate = 0.0
+    delay = 0.0
+
+    def do_POST(self):
+        messages = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"[]")
+        time.sleep(self.delay)
+        if self.path != "/email/batch" or not isinstance(messages, list) or len(messages) > 500:
+            self._reply(422, {"ErrorCode": 300, "Message": "Invalid batch request"})
+        elif random.random() < self.fail_rate:
+            self._reply(429, {"ErrorCode": 429, "Message": "Rate limit exceeded"})
+        else:
+            self._reply(200, [
+                {"ErrorCode": 0, "Message": "OK", "MessageID": uuid.uuid4().hex, "To": message.get("To"), "SubmittedAt": _now()}
+                if "@" in str(message.get("To")) else
+                {"ErrorCode": 300, "Message": "Invalid 'To' address", "To": message.get("To")}
+                for message in messages
+            ])
+
+    def _reply(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        email_logger.info(f"stub: {format % args}")
+
+# ======================================================================================================
+#                                       command line entry point
+# ======================================================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Send bulk email through Postmark, or run a local Postmark stub.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    send_parser = subparsers.add_parser("send", help="Send one email to every recipient")
+    send_parser.add_argument("recipients", nargs="+")
+    send_parser.add_argument("--subject", default="Interview Call")
+    send_parser.add_argument("--text", default="")
+    send_parser.add_argument("--html", default="")
+    stub_parser = subparsers.add_parser("stub", help="Serve a fake Postmark batch endpoint (set POSTMARK_API_URL to it)")
+    stub_parser.add_argument("--port", type=int, default=8025)
+    stub_parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of calls answered with HTTP 429")
+    stub_parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before every answer")
+    args = parser.parse_args(argv)
+
+    if args.command == "stub":
+        _StubHandler.fail_rate = args.fail_rate
+        _StubHandler.delay = args.delay
+        print(f"Postmark stub listening on http://127.0.0.1:{args.port}")
+        ThreadingHTTPServer(("127.0.0.1", args.port), _StubHandler).serve_forever()
+        return 0
+
+    results = send_emails(validate_recipients(args.recipients), args.subject, args.html, args.text)
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if all(result["status"] == "sent" for result in results) else 1
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -1,29 +1,54 @@
 # app.py
-from flask import Flask, render_template, request, jsonify, send_file
-from werkzeug.utils import secure_filename
+from flask import Flask, Request, Response, current_app, render_template, request, jsonify, send_file, stream_with_context
 import os
+import re
+import json
+import queue
 import logging
+import threading
 from datetime import datetime
 from backend import * 
+from bulk_ingest import BULK_MAX_UPLOAD_BYTES, BULK_WORKERS, UploadTooLarge, check_archives, iter_directory, iter_sources, stream_ingestion
+from email_dispatch import get_dispatch, send_emails, submit_dispatch, validate_recipients
+from jobs import get_job, recover_interrupted_jobs, submit_parse_job
+from indexes import ENSURE_INDEXES_ON_STARTUP, ensure_indexes, index_usage
+from pdf_export import find_export_resumes, stream_pdf_zip
+from pdf_maker import schedule_pdf_render
+from resources import check_readiness
 from flask_cors import CORS
-from postmarker.core import PostmarkClient
 from bson.objectid import ObjectId
 from bson.errors import InvalidId
 from dotenv import load_dotenv
 
 load_dotenv()
 
-api_key = os.getenv("SERVER_TOKEN")
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+class UploadLimitRequest(Request):
+    """Request whose body limit is raised for bulk uploads (zips of hundreds of resumes)"""
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'parse_resumes_bulk':
+            return BULK_MAX_UPLOAD_BYTES
+        return current_app.config['MAX_CONTENT_LENGTH']
+
+    # Set when the response streams the uploaded files: they are read after the request is torn
+    # down, so the response closes them instead
+    uploads_streamed = False
+
+    def close(self):
+        if not self.uploads_streamed:
+            super().close()
+
 app = Flask(__name__)
+app.request_class = UploadLimitRequest
 CORS(app)
-app.config['UPLOAD_FOLDER'] = '/home/ritik/Documents/ResumeFlow/RecruitAI/uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB limit
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB limit (BULK_MAX_UPLOAD_BYTES for /parse_resumes/bulk)
 
-# Ensure upload folder exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Directories given to /parse_resumes/bulk must be inside this folder
+BULK_IMPORT_ROOT = os.path.realpath(os.getenv("BULK_IMPORT_ROOT", os.path.dirname(os.path.abspath(__file__))))
 
 @app.route('/')
 def index():
@@ -44,35 +69,30 @@ def parse_resume():
     
     try:
         file_extension = file.filename.split('.')[-1].lower()
-        if file_extension == 'pdf':
-            logging.info("Extracting text from PDF.")
-            resume_text =file.filename+" " + extract_text_from_pdf(file)  # Pass the file object directly
-        elif file_extension == 'docx':
-            logging.info("Extracting text from DOCX.")
-            # Save temporarily to process
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            resume_text =file.filename+" " + extract_text_from_docx(filepath)
-        else:
+        if file_extension not in SUPPORTED_RESUME_EXTENSIONS:
             logging.error("Unsupported file type.")
             return jsonify({'error': 'Unsupported file type'}), 400
-        
-        if not resume_text.strip():
+
+        # Both PDF and DOCX are read straight from the upload stream, nothing is written to disk
+        logging.info(f"Extracting text from {file_extension.upper()}.")
+        resume_text = extract_resume_text(file.filename, file.stream)
+
+        if not resume_text[len(file.filename):].strip():
             logging.error("Empty resume text after extraction.")
             return jsonify({'error': 'Could not extract text from file'}), 400
         
-        structured_data = fn_Resume(resume_text)
+        structured_data = fn_Resume_cached(resume_text, filename=file.filename)
         logging.info("Resume parsed successfully.")
         
         save_parsed_resume(structured_data, resume_text, file.filename)
-        save_resume()
         logging.info("Parsed resume data saved to database.")
         
         response_data = {
             section_name: section_content.model_dump() if isinstance(section_content, BaseModel) else section_content
             for section_name, section_content in structured_data.items()
         }
+        # The PDF is rendered from this record after the response, or on first download
+        schedule_pdf_render(response_data)
         
         return jsonify(response_data)
     
@@ -81,6 +101,143 @@ def parse_resume():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/parse_resume/stream', methods=['POST'])
+def parse_resume_stream():
+    logging.info("Received request to parse resume with streamed sections.")
+    if 'file' not in request.files:
+        logging.warning("No file uploaded in the request.")
+        return jsonify({'error': 'No file uploaded'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        logging.warning("No file selected for upload.")
+        return jsonify({'error': 'No selected file'}), 400
+
+    try:
+        resume_text = extract_resume_text(file.filename, file.stream)
+    except ValueError:
+        logging.error("Unsupported file type.")
+        return jsonify({'error': 'Unsupported file type'}), 400
+
+    if not resume_text[len(file.filename):].strip():
+        logging.error("Empty resume text after extraction.")
+        return jsonify({'error': 'Could not extract text from file'}), 400
+
+    filename = file.filename
+    events = queue.Queue()
+    done = object()
+
+    def run_parse():
+        try:
+            # Per-section extraction even for short resumes: a single call would only
+            # report all sections together once it returns
+            structured_data = fn_Resume_cached(
+                resume_text,
+                on_section=lambda name, content: events.put({'event': 'section', 'section': name, 'data': serialize_pydantic_model(content)}),
+                mode="per_section",
+                filename=filename,
+            )
+            if not structured_data or 'error' in structured_data:
+                events.put({'event': 'error', 'error': structured_data.get('error', 'Resume could not be parsed')})
+                return
+            resume_id = save_parsed_resume(structured_data, resume_text, filename)
+            schedule_pdf_render({name: serialize_pydantic_model(content) for name, content in structured_data.items()})
+            events.put({'event': 'done', 'resume_id': str(resume_id) if resume_id else None,
+                        'metadata': structured_data.get('metadata')})
+        except Exception as e:
+            logging.error(f"Error while streaming resume parse: {e}")
+            events.put({'event': 'error', 'error': str(e)})
+        finally:
+            events.put(done)
+
+    def generate():
+        threading.Thread(target=run_parse, name="parse-stream", daemon=True).start()
+        while True:
+            event = events.get()
+            if event is done:
+                break
+            yield json.dumps(event, default=str) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/parse_resume/async', methods=['POST'])
+def parse_resume_async():
+    logging.info("Received request to parse resume in the background.")
+    if 'file' not in request.files:
+        logging.warning("No file uploaded in the request.")
+        return jsonify({'error': 'No file uploaded'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        logging.warning("No file selected for upload.")
+        return jsonify({'error': 'No selected file'}), 400
+
+    if file.filename.rsplit('.', 1)[-1].lower() not in SUPPORTED_RESUME_EXTENSIONS:
+        logging.error("Unsupported file type.")
+        return jsonify({'error': 'Unsupported file type'}), 400
+
+    try:
+        job_id = submit_parse_job(file.filename, file.read())
+        return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/jobs/{job_id}'}), 202
+    except Exception as e:
+        logging.error(f"Error while queuing resume: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    logging.info(f"Received request for status of job {job_id}")
+    try:
+        job = get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        job['job_id'] = job.pop('_id')
+        return jsonify(job)
+    except Exception as e:
+        logging.error(f"Error while retrieving job {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/parse_resumes/bulk', methods=['POST'])
+def parse_resumes_bulk():
+    logging.info("Received request to parse resumes in bulk.")
+    workers = min(request.args.get('workers', BULK_WORKERS, type=int), BULK_WORKERS)
+    if request.content_length is not None and request.content_length > BULK_MAX_UPLOAD_BYTES:
+        logging.warning(f"Rejected bulk upload of {request.content_length} bytes.")
+        return jsonify({'error': f'Upload exceeds {BULK_MAX_UPLOAD_BYTES} bytes'}), 413
+
+    # Werkzeug spools large uploads to temporary files; resumes are read from them (and from zip
+    # archives, member by member) only as the ingestion window reaches them
+    uploads = [(os.path.basename(file.filename), file.stream) for file in request.files.getlist('files') if file.filename]
+    if uploads:
+        try:
+            check_archives(uploads)
+        except UploadTooLarge as e:
+            logging.warning(f"Rejected bulk upload: {e}")
+            return jsonify({'error': str(e)}), 413
+        except Exception as e:
+            logging.error(f"Could not read uploaded files: {e}")
+            return jsonify({'error': f'Could not read uploaded files: {e}'}), 400
+
+        def generate():
+            try:
+                yield from stream_ingestion(iter_sources(uploads), workers)
+            finally:
+                for _, stream in uploads:
+                    stream.close()
+
+        request.uploads_streamed = True
+        return Response(generate(), mimetype='application/x-ndjson')
+    else:
+        data = request.get_json(silent=True) or {}
+        if not data.get('directory'):
+            logging.warning("No files or directory provided for bulk parsing.")
+            return jsonify({'error': 'Upload files or a zip archive, or provide a directory'}), 400
+        directory = os.path.realpath(os.path.join(BULK_IMPORT_ROOT, data['directory']))
+        if os.path.commonpath([directory, BULK_IMPORT_ROOT]) != BULK_IMPORT_ROOT or not os.path.isdir(directory):
+            logging.warning(f"Rejected bulk directory: {data['directory']}")
+            return jsonify({'error': 'Directory not found'}), 400
+        return Response(stream_ingestion(iter_directory(directory), workers), mimetype='application/x-ndjson')
+
+
 @app.route('/schedule_meeting', methods=['POST'])
 def schedule_meeting():
     logging.info("Received request to schedule a meeting.")
@@ -106,7 +263,7 @@ def schedule_meeting():
             "description": f"Participants: {', '.join(meeting_data['participants'])}"
         }
         
-        save_data([meeting_event], MEETINGS_FILE)
+        meeting_repository.insert_meeting(meeting_event)
         logging.info("Meeting data saved successfully.")
         
         return jsonify(meeting_data)
@@ -119,15 +276,14 @@ def schedule_meeting():
 def get_last_resume():
     logging.info("Received request to get the last parsed resume.")
     try:
-        collection = mydb['job_application']
-        data = list(collection.find().sort('_id', -1).limit(1))
+        data = resume_repository.latest_resume()
         
         if not data:
             logging.warning("No resume data found in the database.")
             return jsonify({'error': 'No resume data found'}), 404
         
         logging.info("Last parsed resume retrieved successfully.")
-        return jsonify(data[0]['parsed_data']['Personal_Details'])
+        return jsonify(data['parsed_data']['Personal_Details'])
     except Exception as e:
         logging.error(f"Error while retrieving the last parsed resume: {e}")
         return jsonify({'error': str(e)}), 500
@@ -136,8 +292,6 @@ def get_last_resume():
 def generate_person_resume(resume_id):
     logging.info(f"Received request to generate PDF for resume with ID: {resume_id}")
     try:
-        collection = mydb['job_application']
-
         # Validate and convert ObjectId
         try:
             object_id = ObjectId(resume_id)
@@ -146,18 +300,18 @@ def generate_person_resume(resume_id):
             return jsonify({'error': 'Invalid resume ID format'}), 400
 
         # Retrieve the resume
-        data = collection.find_one({ "_id": object_id })
+        data = resume_repository.get_resume(object_id)
 
         if not data:
             logging.warning(f"No resume found with ID: {resume_id}")
             return jsonify({'error': 'Resume not found'}), 404
 
-        # Call your custom PDF generator function
-        pdfmaker(data)
-        logging.info(f"Resume PDF generated successfully for ID {resume_id}")
+        # Rendered once per distinct parse, repeat downloads come from the PDF cache
+        pdf_path = pdfmaker(data)
+        logging.info(f"Resume PDF ready for ID {resume_id}")
 
         return send_file(
-            '/home/ritik/Documents/ResumeFlow/RecruitAI/resumes/professional_resume.pdf',
+            pdf_path,
             as_attachment=True,
             download_name='professional_resume.pdf'
         )
@@ -166,15 +320,84 @@ def generate_person_resume(resume_id):
         logging.error(f"Error while generating PDF for resume ID {resume_id}: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+# Largest page a list endpoint returns when ?limit= is given
+MAX_LIST_LIMIT = int(os.getenv("MAX_LIST_LIMIT", "500"))
+FIELD_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$')
+
+def parse_list_args():
+    """Pagination and projection arguments shared by the list endpoints.
+
+    ``limit`` and ``after`` (the ``next_cursor`` of the previous page) select a page in ``_id``
+    order, ``fields`` is a comma separated list of (dotted) fields to return.
+    Raises ValueError for malformed values.
+    """
+    limit = request.args.get('limit')
+    if limit is not None:
+        if not limit.isdigit() or not 0 < int(limit) <= MAX_LIST_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIST_LIMIT}")
+        limit = int(limit)
+    after = request.args.get('after')
+    try:
+        after = ObjectId(after) if after else None
+    except InvalidId:
+        raise ValueError("after must be a cursor returned as next_cursor")
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    invalid_fields = [field for field in fields if not FIELD_NAME_PATTERN.match(field)]
+    if invalid_fields:
+        raise ValueError(f"Invalid fields: {', '.join(invalid_fields)}")
+    return {"limit": limit, "after": after, "fields": fields or None}
+
+def stream_documents(cursor, limit):
+    """Stream documents as JSON while the cursor is read.
+
+    Without a limit the body is a plain JSON array, as the dashboard expects. With a limit it is
+    ``{"items": [...], "next_cursor": ...}`` where ``next_cursor`` is null on the last page.
+    If the cursor fails part way the body is left unterminated, so clients get a parse error
+    instead of a well-formed but truncated list (or a null next_cursor on an incomplete page).
+    """
+    def generate():
+        yield '{"items": [' if limit else '['
+        count, last_id = 0, None
+        try:
+            for document in cursor:
+                last_id = document['_id']
+                document['_id'] = str(document['_id'])
+                yield (',' if count else '') + json.dumps(document, default=str)
+                count += 1
+        except Exception as e:
+            # Headers are already sent, so the status cannot change
+            logging.error(f"Error while streaming documents, response left incomplete: {e}")
+            return
+        finally:
+            cursor.close()
+        if limit:
+            next_cursor = str(last_id) if count == limit else None
+            yield '], "next_cursor": ' + json.dumps(next_cursor) + '}'
+        else:
+            yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
 @app.route('/get_resumes', methods=['GET'])
 def get_resumes():
     logging.info("Received request to get resumes.")
     try:
-        resumes = load_data(RESUMES_FILE)
-        for resume in resumes:
-            resume['_id'] = str(resume['_id'])
-        logging.info("resumes retrieved successfully.")
-        return jsonify(resumes)
+        list_args = parse_list_args()
+        for date_arg in ('uploaded_after', 'uploaded_before'):
+            if request.args.get(date_arg):
+                datetime.fromisoformat(request.args[date_arg])
+        query = resume_repository.resume_filter(
+            category=request.args.get('category'),
+            uploaded_after=request.args.get('uploaded_after'),
+            uploaded_before=request.args.get('uploaded_before'),
+        )
+    except ValueError as e:
+        logging.warning(f"Invalid resume list arguments: {e}")
+        return jsonify({'error': str(e)}), 400
+    try:
+        cursor = resume_repository.find_page(query, **list_args)
+        logging.info("Streaming resumes.")
+        return stream_documents(cursor, list_args["limit"])
     except Exception as e:
         logging.error(f"Error while retrieving resumes: {e}")
         return jsonify({'error': str(e)}), 500
@@ -183,11 +406,14 @@ def get_resumes():
 def get_meetings():
     logging.info("Received request to get meetings.")
     try:
-        meetings = load_data(MEETINGS_FILE)
-        for meeting in meetings:
-            meeting['_id'] = str(meeting['_id'])
-        logging.info("Meetings retrieved successfully.")
-        return jsonify(meetings)
+        list_args = parse_list_args()
+    except ValueError as e:
+        logging.warning(f"Invalid meeting list arguments: {e}")
+        return jsonify({'error': str(e)}), 400
+    try:
+        cursor = meeting_repository.find_page(**list_args)
+        logging.info("Streaming meetings.")
+        return stream_documents(cursor, list_args["limit"])
     except Exception as e:
         logging.error(f"Error while retrieving meetings: {e}")
         return jsonify({'error': str(e)}), 500
@@ -196,27 +422,103 @@ def get_meetings():
 def get_interviewers():
     logging.info("Received request to get Interviewer data.")
     try:
-        interviewers = load_data(INTERVIEWERS_FILE)
-        for interviewer in interviewers:
-            interviewer['_id'] = str(interviewer['_id'])
-        logging.info("interviewers retrieved successfully.")
-        return jsonify(interviewers)
+        list_args = parse_list_args()
+    except ValueError as e:
+        logging.warning(f"Invalid interviewer list arguments: {e}")
+        return jsonify({'error': str(e)}), 400
+    try:
+        cursor = interviewer_repository.find_page(**list_args)
+        logging.info("Streaming interviewers.")
+        return stream_documents(cursor, list_args["limit"])
     except Exception as e:
-        logging.error(f"Error while retrieving meetings: {e}")
+        logging.error(f"Error while retrieving interviewers: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# Largest number of candidates /search_candidates returns
+MAX_SEARCH_RESULTS = int(os.getenv("MAX_SEARCH_RESULTS", "100"))
+
+@app.route('/search_candidates', methods=['GET', 'POST'])
+def search_candidates_route():
+    logging.info("Received request to search candidates.")
+    params = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    query = (params.get('query') or params.get('q') or '').strip()
+    if not query:
+        logging.warning("No search query provided.")
+        return jsonify({'error': 'No query provided'}), 400
+    try:
+        limit = int(params.get('limit', 10))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'limit must be a number'}), 400
+    if not 0 < limit <= MAX_SEARCH_RESULTS:
+        return jsonify({'error': f'limit must be between 1 and {MAX_SEARCH_RESULTS}'}), 400
+
+    try:
+        results = search_candidates(query, limit, params.get('category'))
+        logging.info(f"Candidate search returned {len(results)} results.")
+        return jsonify(results)
+    except Exception as e:
+        logging.error(f"Error while searching candidates: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/export_resumes', methods=['POST'])
+def export_resumes():
+    logging.info("Received request to export resume PDFs.")
+    data = request.get_json(silent=True) or {}
+    try:
+        for date_arg in ('uploaded_after', 'uploaded_before'):
+            if data.get(date_arg):
+                datetime.fromisoformat(data[date_arg])
+        query = resume_repository.resume_filter(data.get('category'), data.get('uploaded_after'), data.get('uploaded_before'))
+        if not data.get('resume_ids') and not query:
+            raise ValueError("Provide resume_ids or a filter (category, uploaded_after, uploaded_before)")
+        documents = find_export_resumes(data.get('resume_ids'), query)
+    except ValueError as e:
+        logging.warning(f"Invalid export request: {e}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error while selecting resumes to export: {e}")
         return jsonify({'error': str(e)}), 500
 
+    if not documents:
+        return jsonify({'error': 'No resumes matched'}), 404
+    logging.info(f"Streaming a zip of {len(documents)} resume PDFs.")
+    return Response(
+        stream_with_context(stream_pdf_zip(documents)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=resumes.zip'},
+    )
+
+@app.route('/cache_stats', methods=['GET'])
+def get_cache_stats():
+    logging.info("Received request to get cache statistics.")
+    return jsonify(cache_stats())
+
+@app.route('/index_stats', methods=['GET'])
+def get_index_stats():
+    logging.info("Received request to get index usage statistics.")
+    return jsonify(index_usage())
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    # Pings MongoDB and lists Ollama models; never runs inference or scans collections
+    readiness = check_readiness()
+    if not readiness["ready"]:
+        logging.warning(f"Readiness check failed: {readiness['checks']}")
+    return jsonify(readiness), 200 if readiness["ready"] else 503
+
 @app.route('/resumes/professional_resume.pdf', methods=['GET'])
 def view_resume_pdf():
     logging.info("Received request to view resume PDF.")
     try:
-        file_path = '/home/ritik/Documents/ResumeFlow/RecruitAI/resumes/professional_resume.pdf'
-        if not os.path.exists(file_path):
+        # The PDF of the latest resume, rendered on first view and cached
+        data = resume_repository.latest_resume()
+        if not data:
             logging.warning("Requested resume PDF not found.")
             return jsonify({'error': 'Resume PDF not found'}), 404
         
         logging.info("Resume PDF found and ready to be displayed.")
         return send_file(
-            file_path,
+            pdfmaker(data),
             mimetype='application/pdf'
         )
     except Exception as e:
@@ -228,18 +530,17 @@ def view_resume_pdf():
 def generate_resume_pdf():
     logging.info("Received request to generate resume PDF.")
     try:
-        collection = mydb['job_application']
-        data = list(collection.find().sort('_id', -1).limit(1))
+        data = resume_repository.latest_resume()
         
         if not data:
             logging.warning("No resume data found in the database.")
             return jsonify({'error': 'No resume data found'}), 404
         
-        pdfmaker(data[0])
+        pdf_path = pdfmaker(data)
         logging.info("Resume PDF generated successfully.")
         
         return send_file(
-            '/home/ritik/Documents/ResumeFlow/RecruitAI/resumes/professional_resume.pdf',
+            pdf_path,
             as_attachment=True,
             download_name='professional_resume.pdf'
         )
@@ -247,67 +548,53 @@ def generate_resume_pdf():
         logging.error(f"Error while generating resume PDF: {e}")
         return jsonify({'error': str(e)}), 500  
 
-# @app.route('/save_resume', methods=['POST'])
-def save_resume():
-    logging.info("Received request to generate resume PDF.")
-    try:
-        collection = mydb['job_application']
-        data = list(collection.find().sort('_id', -1).limit(1))
-        
-        if not data:
-            logging.warning("No resume data found in the database.")
-            return jsonify({'error': 'No resume data found'}), 404
-        
-        pdfmaker(data[0])
-        logging.info("Resume PDF generated and saved successfully.")
-        
-        return jsonify({'message': 'Resume PDF generated and saved successfully.'})
-    except Exception as e:
-        logging.error(f"Error while generating resume PDF: {e}")
-        return jsonify({'error': str(e)}), 500
-
-FROM_EMAIL = "hopefulroentgen@justzeus.com"
-SERVER_TOKEN = api_key
-postmark = PostmarkClient(server_token=SERVER_TOKEN)
-
-def send_email(sender, receiver, subject, html=None, text=None, attachments=None):
-    return postmark.emails.send(
-        From=sender,
-        To=receiver,
-        Subject=subject,
-        HtmlBody=html,
-        TextBody=text,
-        Attachments=attachments,
-        MessageStream="broadcast"
-    )
-
 @app.route('/send-email', methods=['POST'])
 def handle_send_email():
-    data = request.get_json()
-    recipients = data.get('recipients', [])
+    logging.info("Received request to send emails.")
+    data = request.get_json() or {}
     subject = data.get('subject', 'Interview Call')
     text = data.get('text', '')
     html = data.get('html', '')
 
-    if not recipients:
-        return jsonify({'error': 'No recipients provided'}), 400
+    try:
+        recipients = validate_recipients(data.get('recipients', []))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    results = []
-    for receiver in recipients:
-        try:
-            result = send_email(FROM_EMAIL, receiver, subject, html, text)
-            success = result.get("ErrorCode") == 0
-            results.append({
-                'email': receiver,
-                'status': 'sent' if success else 'failed',
-                'message': result.get("Message", "")
-            })
-        except Exception as e:
-            results.append({'email': receiver, 'status': 'error', 'error': str(e)})
+    try:
+        if data.get('async'):
+            dispatch_id = submit_dispatch(recipients, subject, html, text)
+            logging.info(f"Queued email dispatch {dispatch_id} to {len(recipients)} recipients")
+            return jsonify({'dispatch_id': dispatch_id, 'status': 'queued', 'status_url': f'/send-email/{dispatch_id}'}), 202
 
-    return jsonify({'message': 'Emails sent', 'results': results})
+        results = send_emails(recipients, subject, html, text)
+        return jsonify({'message': 'Emails sent', 'results': results})
+    except Exception as e:
+        logging.error(f"Error while sending emails: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/send-email/<dispatch_id>', methods=['GET'])
+def get_email_dispatch(dispatch_id):
+    logging.info(f"Received request for status of email dispatch {dispatch_id}")
+    try:
+        dispatch = get_dispatch(dispatch_id)
+        if not dispatch:
+            return jsonify({'error': 'Email dispatch not found'}), 404
+        dispatch['dispatch_id'] = dispatch.pop('_id')
+        return jsonify(dispatch)
+    except Exception as e:
+        logging.error(f"Error while retrieving email dispatch {dispatch_id}: {e}")
+        return jsonify({'error': str(e)}), 500
 
 
 if __name__ == '__main__':
     logging.info("Starting Flask application.")
+    # Embed the constant section queries once before serving requests
+    get_embeddings()
+    try:
+        recover_interrupted_jobs()
+    except Exception as e:
+        logging.error(f"Could not recover interrupted parse jobs: {e}")
+    if ENSURE_INDEXES_ON_STARTUP:
+        ensure_indexes()
     app.run(debug=False)
\ No newline at end of file
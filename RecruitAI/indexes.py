@@ -0,0 +1,131 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, IndexModel
+
+from repository import (
+    FINGERPRINTS_COLLECTION,
+    INTERVIEWERS_COLLECTION,
+    MEETINGS_COLLECTION,
+    RESUMES_COLLECTION,
+    VERSIONS_COLLECTION,
+)
+from resources import get_db
+
+index_logger = logging.getLogger('indexes')
+
+# Build missing indexes when the Flask app starts (creating an existing index is a no-op)
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES_ON_STARTUP", "1") == "1"
+
+# ======================================================================================================
+#                                       declared indexes
+# ======================================================================================================
+
+# _id is always indexed, which already serves keyset pagination. Filter fields come first and
+# _id last, so filtered pages are still read in _id order.
+INDEXES: Dict[str, List[IndexModel]] = {
+    RESUMES_COLLECTION: [
+        IndexModel([("parsed_data.Classification.category", ASCENDING), ("_id", ASCENDING)], name="category_id"),
+        # Newest-first lookups (latest_resume sorts upload_date descending): a single-field index
+        # is walked in either direction, so the ascending one serves them
+        IndexModel([("upload_date", ASCENDING)], name="upload_date"),
+        IndexModel([("parsed_data.Personal_Details.Email_Address", ASCENDING)], name="candidate_email"),
+    ],
+    MEETINGS_COLLECTION: [
+        IndexModel([("datetime", ASCENDING)], name="meeting_datetime"),
+    ],
+    INTERVIEWERS_COLLECTION: [
+        IndexModel([("email", ASCENDING)], name="interviewer_email"),
+    ],
+    "parse_jobs": [
+        IndexModel([("status", ASCENDING)], name="job_status"),
+    ],
+    # Fingerprints are looked up by _id; resume_id is used when duplicates are merged
+    FINGERPRINTS_COLLECTION: [
+        IndexModel([("resume_id", ASCENDING)], name="fingerprint_resume"),
+    ],
+    VERSIONS_COLLECTION: [
+        IndexModel([("resume_id", ASCENDING), ("archived_at", ASCENDING)], name="version_resume"),
+    ],
+}
+
+# ======================================================================================================
+#                                       index bootstrap and statistics
+# ======================================================================================================
+
+def ensure_indexes(collections: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Create every declared index that does not exist yet.
+
+    Returns, per collection, the names of the indexes that were created and of those already
+    present. A conflicting definition (same name, different keys or options) is reported as an
+    error for that collection and does not stop the others.
+    """
+    db = get_db()
+    report = {}
+    for collection_name, models in INDEXES.items():
+        if collections and collection_name not in collections:
+            continue
+        collection = db[collection_name]
+        try:
+            existing = set(collection.index_information())
+            collection.create_indexes(models)
+            names = [model.document["name"] for model in models]
+            created = [name for name in names if name not in existing]
+            report[collection_name] = {"created": created, "existing": [name for name in names if name in existing]}
+            if created:
+                index_logger.info(f"Created indexes on {collection_name}: {', '.join(created)}")
+        except Exception as e:
+            index_logger.error(f"Could not create indexes on {collection_name}: {str(e)}")
+            report[collection_name] = {"error": str(e)}
+    return report
+
+def index_usage(collections: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Operations served by each index since the server started ($indexStats)"""
+    db = get_db()
+    usage = {}
+    for collection_name in INDEXES:
+        if collections and collection_name not in collections:
+            continue
+        try:
+            usage[collection_name] = {
+                stats["name"]: {
+                    "ops": stats["accesses"]["ops"],
+                    "since": stats["accesses"]["since"].isoformat(),
+                }
+                for stats in db[collection_name].aggregate([{"$indexStats": {}}])
+            }
+        except Exception as e:
+            index_logger.error(f"Could not read index statistics of {collection_name}: {str(e)}")
+            usage[collection_name] = {"error": str(e)}
+    return usage
+
+# ======================================================================================================
+#                                       command line entry point
+# ======================================================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Create the declared MongoDB indexes or report their usage.")
+    parser.add_argument("command", choices=["ensure", "stats"])
+    parser.add_argument("--collection", action="append", help="Limit to this collection (repeatable)")
+    args = parser.parse_args(argv)
+
+    if args.command == "ensure":
+        report = ensure_indexes(args.collection)
+    else:
+        report = index_usage(args.collection)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if any("error" in entry for entry in report.values()) else 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import io
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from backend import (
+    extract_resume_text,
+    fn_Resume_cached,
+    save_parsed_resume,
+    serialize_pydantic_model,
+)
+from pdf_maker import schedule_pdf_render
+from resources import get_db
+
+job_logger = logging.getLogger('jobs')
+
+# ======================================================================================================
+#                                       job queue configuration
+# ======================================================================================================
+
+JOBS_COLLECTION = "parse_jobs"
+# Resumes parsed in the background at the same time, independent of the web server threads
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_STAGES = ("extract", "parse", "save", "pdf")
+
+# ======================================================================================================
+#                                       job state in MongoDB
+# ======================================================================================================
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+def create_job(filename: str) -> str:
+    job_id = uuid.uuid4().hex
+    get_db()[JOBS_COLLECTION].insert_one({
+        "_id": job_id,
+        "filename": filename,
+        "status": "queued",
+        "created_at": _now(),
+        "updated_at": _now(),
+        "stages": {stage: {"status": "pending"} for stage in JOB_STAGES},
+    })
+    return job_id
+
+def update_job(job_id: str, **fields) -> None:
+    get_db()[JOBS_COLLECTION].update_one({"_id": job_id}, {"$set": {**fields, "updated_at": _now()}})
+
+def get_job(job_id: str) -> Optional[Dict]:
+    return get_db()[JOBS_COLLECTION].find_one({"_id": job_id})
+
+def recover_interrupted_jobs() -> int:
+    """Mark jobs left queued or running by a previous process as failed"""
+    result = get_db()[JOBS_COLLECTION].update_many(
+        {"status": {"$in": ["queued", "running"]}},
+        {"$set": {"status": "failed", "error": "Interrupted by a server restart", "updated_at": _now()}},
+    )
+    if result.modified_count:
+        job_logger.warning(f"Marked {result.modified_count} interrupted parse jobs as failed")
+    return result.modified_count
+
+# ======================================================================================================
+#                                       background worker pool
+# ======================================================================================================
+
+class StageTimer:
+    """Records status and duration of one job stage in the job document"""
+
+    def __init__(self, job_id: str, stage: str):
+        self.job_id = job_id
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        update_job(self.job_id, **{f"stages.{self.stage}.status": "running", f"stages.{self.stage}.started_at": _now()})
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        update_job(self.job_id, **{
+            f"stages.{self.stage}.status": "failed" if exc_type else "done",
+            f"stages.{self.stage}.seconds": round(time.perf_counter() - self.started, 3),
+        })
+        return False
+
+
+def run_parse_job(job_id: str, filename: str, data: bytes) -> None:
+    """Extraction, saving and PDF rendering for one uploaded resume"""
+    job_logger.info(f"Starting parse job {job_id} for {filename}")
+    update_job(job_id, status="running")
+    try:
+        with StageTimer(job_id, "extract"):
+            resume_text = extract_resume_text(filename, io.BytesIO(data))
+            if not resume_text[len(filename):].strip():
+                raise ValueError("Could not extract text from file")
+
+        with StageTimer(job_id, "parse"):
+            structured_data = fn_Resume_cached(resume_text, filename=filename)
+            if not structured_data or "error" in structured_data:
+                raise ValueError(structured_data.get("error", "Resume could not be parsed"))
+
+        with StageTimer(job_id, "save"):
+            resume_id = save_parsed_resume(structured_data, resume_text, filename)
+
+        serializable_data = {
+            section_name: serialize_pydantic_model(section_content)
+            for section_name, section_content in structured_data.items()
+        }
+        # Same policy as the synchronous upload: the render is queued off this worker in
+        # background mode, and left to the first download in lazy mode
+        pdf_status = "queued" if schedule_pdf_render(serializable_data) else "skipped"
+        update_job(job_id, **{"stages.pdf.status": pdf_status})
+
+        classification = serializable_data.get("Classification")
+        update_job(job_id, status="done", result={
+            "resume_id": str(resume_id) if resume_id else None,
+            "category": classification.get("category") if isinstance(classification, dict) else None,
+        })
+        job_logger.info(f"Parse job {job_id} finished")
+    except Exception as e:
+        job_logger.error(f"Parse job {job_id} failed: {str(e)}")
+        update_job(job_id, status="failed", error=str(e))
+
+
+# Threads are started lazily by the executor, so importing this module stays cheap
+_executor = ThreadPoolExecutor(max_workers=max(1, JOB_WORKERS), thread_name_prefix="parse-job")
+
+def submit_parse_job(filename: str, data: bytes) -> str:
+    """Queue a resume for background parsing and return its job id immediately"""
+    job_id = create_job(filename)
+    _executor.submit(run_parse_job, job_id, filename, data)
+    job_logger.info(f"Queued parse job {job_id} for {filename}")
+    return job_id
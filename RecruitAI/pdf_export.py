@@ -0,0 +1,169 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import argparse
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+
+from pdf_maker import evict_pdf_cache, generate_resume_html, pdf_cache_key, pdf_cache_path, pdf_cache_stats, render_pdf_bytes, resume_stylesheets, store_cached_pdf
+from repository import resume_repository
+
+export_logger = logging.getLogger('pdf_export')
+
+# ======================================================================================================
+#                                       batch export configuration
+# ======================================================================================================
+
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", str(os.cpu_count() or 1)))
+# Largest number of resumes in one export
+EXPORT_MAX_RESUMES = int(os.getenv("EXPORT_MAX_RESUMES", "500"))
+
+# ======================================================================================================
+#                                       render worker processes
+# ======================================================================================================
+
+def _init_worker():
+    """Runs once per worker process: load WeasyPrint, fonts, the resume stylesheet and template"""
+    resume_stylesheets()
+    generate_resume_html({})
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared render pool, started on the first export and kept warm afterwards"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, EXPORT_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+# ======================================================================================================
+#                                       streamed zip export
+# ======================================================================================================
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink for ZipFile whose bytes are handed out after every member"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _pdf_filename(document: Dict[str, Any]) -> str:
+    full_name = ((document.get("parsed_data") or {}).get("Personal_Details") or {}).get("Full_Name") or "resume"
+    safe_name = re.sub(r"[^A-Za-z0-9]+", "_", full_name).strip("_") or "resume"
+    return f"{safe_name}_{document['_id']}.pdf"
+
+def find_export_resumes(resume_ids: Optional[List[str]] = None, query: Optional[Dict[str, Any]] = None) -> List[Dict]:
+    """Resumes selected by id or by a repository filter, at most EXPORT_MAX_RESUMES"""
+    if resume_ids:
+        try:
+            query = {"_id": {"$in": [ObjectId(resume_id) for resume_id in resume_ids]}}
+        except InvalidId as e:
+            raise ValueError(f"Invalid resume id: {str(e)}")
+    documents = list(resume_repository.find_page(query or {}, fields=["parsed_data"], limit=EXPORT_MAX_RESUMES + 1))
+    if len(documents) > EXPORT_MAX_RESUMES:
+        raise ValueError(f"At most {EXPORT_MAX_RESUMES} resumes can be exported at once")
+    return documents
+
+def stream_pdf_zip(documents: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """Zip archive of the PDFs of ``documents``, yielded as each PDF becomes available.
+
+    Cached PDFs are added first; the rest are rendered on the process pool and added in the
+    order they finish (and stored in the PDF cache). A manifest.json with the status of every
+    resume closes the archive.
+    """
+    sink = _ZipStream()
+    manifest = []
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        pending = []
+        for document in documents:
+            key = pdf_cache_key(document.get("parsed_data") or {})
+            filename = _pdf_filename(document)
+            try:
+                with open(pdf_cache_path(key), "rb") as cached_file:
+                    archive.writestr(filename, cached_file.read())
+            except FileNotFoundError:
+                pending.append((key, document))
+                continue
+            pdf_cache_stats.record(True)
+            manifest.append({"resume_id": str(document["_id"]), "file": filename, "status": "cached"})
+            yield sink.drain()
+
+        if pending:
+            export_logger.info(f"Rendering {len(pending)} PDFs on {EXPORT_WORKERS} worker processes")
+        futures = {get_pool().submit(render_pdf_bytes, document.get("parsed_data") or {}): (key, document) for key, document in pending}
+        for future in as_completed(futures):
+            key, document = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                export_logger.error(f"Could not render resume {document['_id']}: {str(e)}")
+                manifest.append({"resume_id": str(document["_id"]), "status": "error", "error": str(e)})
+                continue
+            pdf_cache_stats.record(False)
+            store_cached_pdf(key, data)
+            filename = _pdf_filename(document)
+            archive.writestr(filename, data)
+            manifest.append({"resume_id": str(document["_id"]), "file": filename, "status": "rendered"})
+            yield sink.drain()
+
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    yield sink.drain()
+    if pending:
+        evict_pdf_cache()
+
+# ======================================================================================================
+#                                       command line entry point
+# ======================================================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the PDFs of many resumes as one zip archive.")
+    parser.add_argument("--ids", nargs="+", help="Resume ids to export")
+    parser.add_argument("--category", help="Export resumes of this classification category")
+    parser.add_argument("--uploaded-after", help="ISO date, inclusive")
+    parser.add_argument("--uploaded-before", help="ISO date, exclusive")
+    parser.add_argument("-o", "--output", default="resumes.zip", help="Zip file to write")
+    args = parser.parse_args(argv)
+
+    query = resume_repository.resume_filter(args.category, args.uploaded_after, args.uploaded_before)
+    documents = find_export_resumes(args.ids, query)
+    with open(args.output, "wb") as file:
+        for chunk in stream_pdf_zip(documents):
+            file.write(chunk)
+    print(f"Exported {len(documents)} resumes to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(main())
@@ -1,290 +1,198 @@
-from weasyprint import HTML
 from datetime import datetime
-import pymongo
-
-
-
-from weasyprint import HTML
-from datetime import datetime
-def generate_resume_html(data):
-    personal = data.get("Personal_Details", {})
-    summary = data.get("Professional_Summary", {})
-    experience = data.get("Work_Experience", {}).get("list_of_experience", [])
-    education = data.get("Education_Details", {}).get("list_of_education", [])
-    skills = data.get("Skills_Details", {})
-    certifications = data.get("Certifications_Details", {}).get("list_of_certificates", [])
-    projects = data.get("Projects_Details", {}).get("list_of_projects", [])
-    additional = data.get("Additional_Information", {})
-    achievements = data.get("Achievements_Details", {}).get("list_of_achievements", [])
-
-    def format_date(date_str):
-        for fmt in ('%B %Y', '%Y-%m-%d'):
-            try:
-                return datetime.strptime(date_str, fmt).strftime('%b %Y')
-            except:
-                continue
-        return date_str or ""
-
-    def list_items(items, bullet_char="•"):
-        return ''.join(f"<li>{bullet_char} {item}</li>" for item in items)
-
-    def format_skills(skill_items):
-        html = ""
-        for skill in skill_items:
-            parts = skill.split(':')
-            if len(parts) > 1:
-                html += f"<li><strong>{parts[0].strip()}:</strong> {parts[1].strip()}</li>"
-            else:
-                html += f"<li>{parts[0]}</li>"
-        return html
-
-    html = f"""
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: 'Segoe UI', sans-serif;
-                font-size: 10.5pt;
-                margin: 20px;
-                color: #333;
-                line-height: 1.5;
-                background-color: #ffffff;
-            }}
-            h1 {{
-                font-size: 24px;
-                margin: 0 0 5px 0;
-                color: #1e3a8a;
-                border-bottom: 2px solid #1e40af;
-                padding-bottom: 5px;
-            }}
-            h2 {{
-                font-size: 16px;
-                border-bottom: 1px solid #d1d5db;
-                margin-top: 20px;
-                color: #1d4ed8;
-                padding-bottom: 3px;
-            }}
-            h3 {{
-                font-size: 14px;
-                margin: 10px 0 5px;
-                color: #374151;
-            }}
-            .header {{
-                margin-bottom: 15px;
-            }}
-            .contact-info {{
-                font-size: 10pt;
-                margin-bottom: 5px;
-                color: #4b5563;
-            }}
-            .contact-links a {{
-                color: #2563eb;
-                text-decoration: none;
-                margin-right: 10px;
-            }}
-            .section {{
-                margin-bottom: 20px;
-            }}
-            ul {{
-                padding-left: 20px;
-                margin: 8px 0;
-                list-style-type: none;
-            }}
-            li {{
-                margin-bottom: 5px;
-                position: relative;
-                padding-left: 15px;
-            }}
-            li:before {{
-                content: "•";
-                position: absolute;
-                left: 0;
-                color: #2563eb;
-                font-weight: bold;
-            }}
-            .inline-list li {{
-                display: inline-block;
-                background: #e0f2fe;
-                color: #0c4a6e;
-                margin: 3px 5px 3px 0;
-                padding: 3px 8px;
-                border-radius: 4px;
-                font-size: 9.5pt;
-            }}
-            .inline-list li:before {{
-                content: none;
-            }}
-            .two-col {{
-                display: flex;
-                justify-content: space-between;
-                flex-wrap: wrap;
-            }}
-            .item {{
-                margin-bottom: 12px;
-                width: 100%;
-            }}
-            .meta {{
-                font-size: 9.5pt;
-                color: #6b7280;
-                margin-bottom: 5px;
-                font-style: italic;
-            }}
-            .job-description {{
-                margin-left: 15px;
-            }}
-            .project-item {{
-                margin-bottom: 15px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>{personal.get("Full_Name", "")}</h1>
-            <div class="contact-info">
-                {personal.get("Email_Address", "")} | {personal.get("Phone_Number", "")} | {personal.get("City", "")}, {personal.get("State", "")}
-            </div>
-            <div class="contact-links">
-                {" | ".join(filter(None, [
-                    f'<a href="{personal.get("LinkedIn_Profile", "#")}">LinkedIn</a>' if personal.get("LinkedIn_Profile") else "",
-                    f'<a href="{personal.get("GitHub_Profile", "#")}">GitHub</a>' if personal.get("GitHub_Profile") else "",
-                    f'<a href="{personal.get("Portfolio_Website")}">Portfolio</a>' if personal.get("Portfolio_Website") else ""
-                ]))}
-            </div>
-        </div>
-
-        <div class="section">
-            <h2>Professional Summary</h2>
-            <ul>
-                <li>{summary.get("Summary", "")}</li>
-                {f'<li>{summary["Objective"]}</li>' if summary.get("Objective") else ''}
-            </ul>
-        </div>
-
-        <div class="section">
-            <h2>Work Experience</h2>
+from functools import lru_cache
+from html import escape as html_escape
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from markupsafe import Markup
+from caching import CacheStats, content_hash
+from resources import get_weasyprint
+
+pdf_logger = logging.getLogger('pdf')
+
+# Bump whenever templates/resume.html or resume.css changes so cached PDFs are rendered again
+TEMPLATE_VERSION = "3"
+
+# Rendered PDFs are stored as <hash of parsed_data and template version>.pdf
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resumes", "cache"))
+PDF_CACHE_MAX_FILES = int(os.getenv("PDF_CACHE_MAX_FILES", "500"))
+PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", "256"))
+
+# background: uploads queue a render into the PDF cache, off the request path
+# lazy:       nothing is rendered until the PDF is first downloaded
+RENDER_PDF_ON_UPLOAD = os.getenv("RENDER_PDF_ON_UPLOAD", "background")
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "1"))
+
+pdf_cache_stats = CacheStats()
+# Striped locks: concurrent requests for the same resume render it once
+_render_locks = [threading.Lock() for _ in range(64)]
+
+# ======================================================================================================
+#                                       resume template
+# ======================================================================================================
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+# Compiled templates are kept here, so new processes (render and export workers) skip compiling
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "templates"))
+
+with open(os.path.join(TEMPLATE_DIR, "resume.css"), encoding="utf-8") as _css_file:
+    RESUME_CSS = _css_file.read()
+
+@lru_cache(maxsize=4096)
+def format_date(date_str):
+    for fmt in ('%B %Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(date_str, fmt).strftime('%b %Y')
+        except (TypeError, ValueError):
+            continue
+    return date_str or ""
+
+def escape_value(value):
+    """Finalizer of every {{ }} output: HTML-escaped unless it is already markup (the CSS, list_items).
+
+    Cheaper than autoescape, which wraps each value in a Markup object.
     """
-    for exp in experience:
-        start = format_date(exp.get("start_date"))
-        end = format_date(exp.get("end_date") or "Present")
-        duration = f"{start} - {end}" if start or end else exp.get("duration", "")
-        html += f"""
-            <div class="item">
-                <h3>{exp.get("company", "")}</h3>
-                <div class="meta">{exp.get("title", "")} | {exp.get("location", "")} | {duration}</div>
-                {f'<div><strong>Technologies Used:</strong> <ul class="inline-list">{list_items(exp["technologies_used"], "")}</ul></div>' if exp.get("technologies_used") else ''}
-            </div>
-        """
-
-    html += """
-        </div>
-
-        <div class="section">
-            <h2>Education</h2>
+    return value if isinstance(value, Markup) else html_escape(str(value))
+
+def list_items(items, bullet=""):
+    """<li> elements for a list of values, each escaped"""
+    prefix = f"{bullet} " if bullet else ""
+    return Markup("".join([f"<li>{prefix}{html_escape(str(item))}</li>" for item in items]))
+
+def _create_template_environment():
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        finalize=escape_value,
+        bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        # The template files never change while the app runs
+        auto_reload=False,
+    )
+    environment.filters["format_date"] = format_date
+    environment.filters["list_items"] = list_items
+    return environment
+
+_template_environment = _create_template_environment()
+
+def generate_resume_html(data, embed_css=True):
+    """HTML of a resume; without ``embed_css`` the caller passes RESUME_CSS as a stylesheet.
+
+    Every value from the parsed resume is HTML-escaped by the template.
     """
-    for edu in education:
-        years = edu.get("years", f"{format_date(edu.get('start_date'))} - {format_date(edu.get('end_date'))}")
-        html += f"""
-            <div class="item">
-                <h3>{edu.get("degree", "")}</h3>
-                <div class="meta">{edu.get("institution", "")} | {years} {f"| GPA: {edu.get('percentage')}" if edu.get("percentage") else ''}</div>
-                {f'<div><strong>Specialization:</strong> {edu["specialization"]}</div>' if edu.get("specialization") else ''}
-                {f'<div><strong>Relevant Coursework:</strong> <ul class="inline-list">{list_items(edu["relevant_coursework"], "")}</ul></div>' if edu.get("relevant_coursework") else ''}
-                {f'<div><strong>Achievements:</strong> <ul>{list_items(edu["achievements"])}</ul></div>' if edu.get("achievements") else ''}
-            </div>
-        """
-
-    html += """
-        </div>
-
-        <div class="section">
-            <h2>Technical Skills</h2>
-    """
-    for title, key in [("Programming Languages", "Programming_Languages"), 
-                      ("Frameworks & Libraries", "Frameworks_Libraries"),
-                      ("Tools & Software", "Tools_Software"),
-                      ("Methodologies", "Methodologies")]:
-        if skills.get(key):
-            html += f"""
-            <h3>{title}</h3>
-            <ul class="inline-list">{list_items(skills[key], "")}</ul>
-            """
-
-
-    if certifications:
-        html += """
-        <div class="section">
-            <h2>Certifications</h2>
-            <ul>
-        """
-        for cert in certifications:
-            html += f"""
-                <li><strong>{cert.get('Certification_name')}</strong> - {cert.get('Issuing_organization')}</li>
-            """
-        html += "</ul></div>"
-
-    if projects:
-        html += """
-        <div class="section">
-            <h2>Projects</h2>
-        """
-        for proj in projects:
-            html += f"""
-            <div class="project-item">
-                <h3>{proj.get("Project_name")}</h3>
-                <div class="meta"><strong>Role:</strong> {proj.get("Role", "")} | <strong>Duration:</strong> {proj.get("Duration", "")}</div>
-                <div>{proj.get("Project_description", "")}</div>
-                {f'<div><strong>Technologies Used:</strong> <ul class="inline-list">{list_items(proj["Technologies_used"], "")}</ul></div>' if proj.get("Technologies_used") else ''}
-                {f'<div><strong>Key Achievements:</strong> <ul>{list_items(proj["Key_achievements"])}</ul></div>' if proj.get("Key_achievements") else ''}
-            </div>
-            """
-        html += "</div>"
-
-    if additional:
-        html += """
-        <div class="section">
-            <h2>Additional Information</h2>
-        """
-        for key, label in [("Hobbies", "Hobbies"), ("Interests", "Interests"), ("Languages", "Languages")]:
-            if additional.get(key):
-                html += f"""
-                <h3>{label}</h3>
-                <ul class="inline-list">{list_items(additional[key], "")}</ul>
-                """
-        if additional.get("Availability"):
-            html += f"""
-            <h3>Availability</h3>
-            <div>{additional['Availability']}</div>
-            """
-        html += "</div>"
-
-    if achievements:
-        html += """
-        <div class="section">
-            <h2>Key Achievements</h2>
-            <ul>
-        """
-        for ach in achievements:
-            impact = f" <em>(Impact: {ach['Impact']})</em>" if ach.get("Impact") else ""
-            html += f"""
-                <li>{ach.get('Achievement_description', '')}{impact}</li>
-            """
-        html += "</ul></div>"
-
-    html += "</body></html>"
-    return html
-
-
-
-
-client = pymongo.MongoClient("mongodb://localhost:27017/")
-db = client["resumedb"]
-collection = db["job_application"]
-resume_data = list(collection.find())
+    def section(key, list_key=None):
+        value = data.get(key) or {}
+        return (value.get(list_key) or []) if list_key else value
+
+    return _template_environment.get_template("resume.html").render(
+        resume_css=Markup(RESUME_CSS) if embed_css else None,
+        personal=section("Personal_Details"),
+        summary=section("Professional_Summary"),
+        experience=section("Work_Experience", "list_of_experience"),
+        education=section("Education_Details", "list_of_education"),
+        skills=section("Skills_Details"),
+        certifications=section("Certifications_Details", "list_of_certificates"),
+        projects=section("Projects_Details", "list_of_projects"),
+        additional=section("Additional_Information"),
+        achievements=section("Achievements_Details", "list_of_achievements"),
+    )
+
+# WeasyPrint parses RESUME_CSS once per thread instead of once per document
+_stylesheet_state = threading.local()
+
+def resume_stylesheets():
+    """RESUME_CSS parsed for this thread, as (stylesheets, font_config) for write_pdf"""
+    if not hasattr(_stylesheet_state, "stylesheets"):
+        weasyprint = get_weasyprint()
+        from weasyprint.text.fonts import FontConfiguration
+        font_config = FontConfiguration()
+        _stylesheet_state.stylesheets = [weasyprint.CSS(string=RESUME_CSS, font_config=font_config)]
+        _stylesheet_state.font_config = font_config
+    return _stylesheet_state.stylesheets, _stylesheet_state.font_config
+
+def render_pdf_bytes(parsed_data):
+    """Render a resume to PDF in memory, with the shared parsed stylesheet"""
+    stylesheets, font_config = resume_stylesheets()
+    html_content = generate_resume_html(parsed_data, embed_css=False)
+    return get_weasyprint().HTML(string=html_content).write_pdf(stylesheets=stylesheets, font_config=font_config)
+
+def pdf_cache_key(parsed_data):
+    return content_hash(TEMPLATE_VERSION, json.dumps(parsed_data, sort_keys=True, default=str))
+
+def evict_pdf_cache():
+    """Delete the least recently used PDFs above the file count or size limit"""
+    entries = []
+    for entry in os.scandir(PDF_CACHE_DIR):
+        if entry.name.endswith(".pdf"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total_bytes = sum(size for _, size, _ in entries)
+    removed = 0
+    while entries and (len(entries) > PDF_CACHE_MAX_FILES or total_bytes > PDF_CACHE_MAX_MB * 1024 * 1024):
+        _, size, path = entries.pop(0)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+        removed += 1
+    if removed:
+        pdf_logger.info(f"Evicted {removed} PDFs from the cache")
+    return removed
+
+def pdf_cache_path(key):
+    return os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+
+def store_cached_pdf(key, data):
+    """Add rendered PDF bytes to the cache and return the file path"""
+    path = pdf_cache_path(key)
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    # Written under a unique name and renamed, so readers never see a partial file
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+def cached_pdf_path(parsed_data):
+    """Path of the rendered PDF for this resume, rendering it only if it is not cached"""
+    key = pdf_cache_key(parsed_data)
+    path = pdf_cache_path(key)
+    with _render_locks[int(key[:8], 16) % len(_render_locks)]:
+        if os.path.exists(path):
+            pdf_cache_stats.record(True)
+            os.utime(path)  # mtime is the LRU clock
+            return path
+        pdf_cache_stats.record(False)
+        store_cached_pdf(key, render_pdf_bytes(parsed_data))
+    pdf_logger.info(f"Rendered PDF {key[:12]}")
+    evict_pdf_cache()
+    return path
+
+def pdf_cache_info():
+    return {**pdf_cache_stats.as_dict(), "template_version": TEMPLATE_VERSION, "max_files": PDF_CACHE_MAX_FILES, "max_mb": PDF_CACHE_MAX_MB}
 
 def pdfmaker(resume_data):
-    html_content = generate_resume_html(resume_data["parsed_data"])
-    HTML(string=html_content).write_pdf("/home/ritik/Documents/ResumeFlow/RecruitAI/resumes/professional_resume.pdf")
-    print(f"PDF Resume generated")
-
-# pdfmaker(resume_data[0])
-
+    """Render (or reuse) the PDF of a stored resume record and return its path"""
+    return cached_pdf_path(resume_data["parsed_data"])
+
+_render_executor = ThreadPoolExecutor(max_workers=max(1, PDF_RENDER_WORKERS), thread_name_prefix="pdf-render")
+
+def _prerender(parsed_data):
+    try:
+        cached_pdf_path(parsed_data)
+    except Exception as e:
+        pdf_logger.error(f"Background PDF render failed: {str(e)}")
+
+def schedule_pdf_render(parsed_data):
+    """Queue a render of a just-saved resume so its first download is a cache hit"""
+    if RENDER_PDF_ON_UPLOAD != "background":
+        return False
+    _render_executor.submit(_prerender, parsed_data)
+    return True
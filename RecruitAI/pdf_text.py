@@ -0,0 +1,90 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List
+
+from pypdf import PdfReader
+
+# Kept free of backend imports: worker processes import only this module
+pdf_logger = logging.getLogger('pdf_text')
+
+# ======================================================================================================
+#                                       PDF extraction budgets
+# ======================================================================================================
+
+# Larger uploads are rejected before parsing
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+# Only the first pages are extracted; resume content beyond this is ignored
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "40"))
+# Documents with at least this many pages are extracted across the process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Seconds to wait for the pages of one document from the process pool
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", "60"))
+
+class PdfBudgetExceeded(ValueError):
+    """Raised when a PDF is larger than PDF_MAX_BYTES"""
+
+# ======================================================================================================
+#                                       page extraction
+# ======================================================================================================
+
+def extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop); runs inside a worker process"""
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared process pool, created on first use with the spawn start method (safe in threaded servers)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def read_pdf_bytes(file_path_or_object) -> bytes:
+    """Read a PDF from a path or file object, refusing anything over PDF_MAX_BYTES"""
+    if isinstance(file_path_or_object, str):
+        if os.path.getsize(file_path_or_object) > PDF_MAX_BYTES:
+            raise PdfBudgetExceeded(f"PDF is larger than {PDF_MAX_BYTES} bytes")
+        with open(file_path_or_object, 'rb') as file:
+            return file.read()
+    data = file_path_or_object.read(PDF_MAX_BYTES + 1)
+    if len(data) > PDF_MAX_BYTES:
+        raise PdfBudgetExceeded(f"PDF is larger than {PDF_MAX_BYTES} bytes")
+    return data
+
+def iter_pdf_pages(data: bytes, max_pages: int = PDF_MAX_PAGES) -> Iterator[str]:
+    """Yield the text of each page in order.
+
+    Small documents are read page by page in this process. Larger ones are split into page
+    ranges that are extracted in parallel by the process pool.
+    """
+    reader = PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    if page_count > max_pages:
+        pdf_logger.warning(f"PDF has {page_count} pages, extracting only the first {max_pages}")
+        page_count = max_pages
+
+    if page_count < PDF_PARALLEL_MIN_PAGES or PDF_WORKERS <= 1:
+        for index in range(page_count):
+            yield reader.pages[index].extract_text() or ""
+        return
+
+    step = -(-page_count // PDF_WORKERS)
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+    pdf_logger.info(f"Extracting {page_count} PDF pages across {len(starts)} worker processes")
+    ranges = get_pool().map(extract_page_range, [data] * len(starts), starts, stops, timeout=PDF_EXTRACT_TIMEOUT)
+    for texts in ranges:
+        yield from texts
@@ -0,0 +1,131 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from bson.objectid import ObjectId
+
+from resources import get_db
+
+repository_logger = logging.getLogger('repository')
+
+# ======================================================================================================
+#                                       collection names
+# ======================================================================================================
+
+RESUMES_COLLECTION = "job_application"
+MEETINGS_COLLECTION = "meeting_records"
+INTERVIEWERS_COLLECTION = "interviewers"
+# Candidate deduplication (see dedup.py)
+FINGERPRINTS_COLLECTION = "candidate_fingerprints"
+VERSIONS_COLLECTION = "resume_versions"
+
+# Documents fetched per round trip while a list response is streamed
+LIST_BATCH_SIZE = int(os.getenv("LIST_BATCH_SIZE", "200"))
+
+# ======================================================================================================
+#                                       repositories
+# ======================================================================================================
+
+class Repository:
+    """Access to one MongoDB collection through the shared, pooled client.
+
+    Writes rely on the client's write concern: an acknowledged insert is durable as configured,
+    so documents are never read back to verify them.
+    """
+
+    collection_name: str
+
+    def __init__(self, collection_name: Optional[str] = None):
+        if collection_name is not None:
+            self.collection_name = collection_name
+
+    @property
+    def collection(self):
+        return get_db()[self.collection_name]
+
+    def insert(self, document: Dict[str, Any]) -> ObjectId:
+        """Insert a document (``_id`` is added to it) and return the new id"""
+        result = self.collection.insert_one(document)
+        if not result.acknowledged:
+            raise RuntimeError(f"Insert into {self.collection_name} was not acknowledged")
+        repository_logger.info(f"Inserted {result.inserted_id} into {self.collection_name}")
+        return result.inserted_id
+
+    def find_all(self) -> List[Dict[str, Any]]:
+        return list(self.collection.find())
+
+    def find_by_id(self, document_id: ObjectId) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one({"_id": document_id})
+
+    def find_page(self, query: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+                  after: Optional[ObjectId] = None, limit: Optional[int] = None):
+        """Cursor over documents in ``_id`` order, starting after ``after`` (keyset pagination).
+
+        Only ``fields`` (plus ``_id``) are returned when given. Documents are fetched in batches
+        of LIST_BATCH_SIZE as the cursor is iterated, never all at once.
+        """
+        query = dict(query or {})
+        if after is not None:
+            query["_id"] = {"$gt": after}
+        projection = {field: 1 for field in fields} if fields else None
+        cursor = self.collection.find(query, projection).sort("_id", 1).batch_size(LIST_BATCH_SIZE)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+
+class ResumeRepository(Repository):
+    collection_name = RESUMES_COLLECTION
+
+    def insert_resume(self, resume_record: Dict[str, Any]) -> ObjectId:
+        return self.insert(resume_record)
+
+    def get_resume(self, resume_id: ObjectId) -> Optional[Dict[str, Any]]:
+        return self.find_by_id(resume_id)
+
+    def replace_resume(self, resume_id: ObjectId, resume_record: Dict[str, Any]) -> None:
+        self.collection.replace_one({"_id": resume_id}, {k: v for k, v in resume_record.items() if k != "_id"})
+
+    def latest_resume(self) -> Optional[Dict[str, Any]]:
+        """Most recently uploaded resume.
+
+        Sorted on upload_date rather than _id: a returning candidate keeps the _id of their
+        first upload, but every save sets upload_date (see dedup.save_resume_record).
+        """
+        return self.collection.find_one(sort=[("upload_date", -1)])
+
+    @staticmethod
+    def resume_filter(category: Optional[str] = None, uploaded_after: Optional[str] = None,
+                      uploaded_before: Optional[str] = None) -> Dict[str, Any]:
+        """Query on classification category and upload date (ISO strings compare in date order)"""
+        query: Dict[str, Any] = {}
+        if category:
+            query["parsed_data.Classification.category"] = category
+        upload_date = {}
+        if uploaded_after:
+            upload_date["$gte"] = uploaded_after
+        if uploaded_before:
+            upload_date["$lt"] = uploaded_before
+        if upload_date:
+            query["upload_date"] = upload_date
+        return query
+
+
+class MeetingRepository(Repository):
+    collection_name = MEETINGS_COLLECTION
+
+    def insert_meeting(self, meeting: Dict[str, Any]) -> ObjectId:
+        return self.insert(meeting)
+
+
+class InterviewerRepository(Repository):
+    collection_name = INTERVIEWERS_COLLECTION
+
+
+resume_repository = ResumeRepository()
+meeting_repository = MeetingRepository()
+interviewer_repository = InterviewerRepository()
@@ -0,0 +1,136 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+resource_logger = logging.getLogger('resources')
+
+# ======================================================================================================
+#                                       external service configuration
+# ======================================================================================================
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1")
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DB = os.getenv("MONGO_DB", "resumedb")
+# How long a MongoDB operation waits for a reachable server before failing
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# Connection pool of the one MongoClient shared by every module and thread
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+# Write concern checked by the server, so writes are not read back to verify them
+MONGO_WRITE_CONCERN = os.getenv("MONGO_WRITE_CONCERN", "1")
+MONGO_WRITE_TIMEOUT_MS = int(os.getenv("MONGO_WRITE_TIMEOUT_MS", "5000"))
+MONGO_JOURNAL = os.getenv("MONGO_JOURNAL", "0") == "1"
+# Upper bound for each dependency check made by the readiness probe
+READINESS_TIMEOUT_SECONDS = float(os.getenv("READINESS_TIMEOUT_SECONDS", "2"))
+
+# ======================================================================================================
+#                                       lazy resource registry
+# ======================================================================================================
+
+class ResourceRegistry:
+    """Named factories whose results are created once, on first use.
+
+    Importing a module never opens connections or loads heavy libraries; the first caller of
+    ``get`` pays for it and every later caller (from any thread) shares the same instance.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+        with self._locks[name]:
+            if name not in self._instances:
+                started = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                resource_logger.info(f"Initialized {name} in {time.perf_counter() - started:.3f}s")
+        return self._instances[name]
+
+    def is_initialized(self, name: str) -> bool:
+        return name in self._instances
+
+    def initialized(self) -> List[str]:
+        return sorted(self._instances)
+
+registry = ResourceRegistry()
+
+# ======================================================================================================
+#                                       resource factories
+# ======================================================================================================
+
+def _create_ollama_client():
+    from openai import OpenAI
+    resource_logger.info(f"Initializing Ollama client with base URL: {OLLAMA_BASE_URL}")
+    return OpenAI(base_url=OLLAMA_BASE_URL, api_key="ollama")
+
+def _create_mongo_client():
+    import pymongo
+    resource_logger.info(f"Connecting to MongoDB database {MONGO_DB} (pool size {MONGO_MAX_POOL_SIZE})")
+    return pymongo.MongoClient(
+        MONGO_URI,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        w=int(MONGO_WRITE_CONCERN) if MONGO_WRITE_CONCERN.isdigit() else MONGO_WRITE_CONCERN,
+        wTimeoutMS=MONGO_WRITE_TIMEOUT_MS,
+        journal=MONGO_JOURNAL,
+    )
+
+def _load_weasyprint():
+    # Loading WeasyPrint pulls in Pango and the font stack, so it is only done for PDF rendering
+    import weasyprint
+    return weasyprint
+
+registry.register("ollama", _create_ollama_client)
+registry.register("mongo", _create_mongo_client)
+registry.register("weasyprint", _load_weasyprint)
+
+def get_ollama_client():
+    return registry.get("ollama")
+
+def get_mongo_client():
+    return registry.get("mongo")
+
+def get_db():
+    return get_mongo_client()[MONGO_DB]
+
+def get_weasyprint():
+    return registry.get("weasyprint")
+
+# ======================================================================================================
+#                                       readiness probe
+# ======================================================================================================
+
+def check_readiness() -> Dict[str, Any]:
+    """Cheap dependency checks: a MongoDB ping and the Ollama model list, no LLM inference"""
+    checks = {}
+    try:
+        get_mongo_client().admin.command("ping", maxTimeMS=int(READINESS_TIMEOUT_SECONDS * 1000))
+        checks["mongo"] = "ok"
+    except Exception as e:
+        checks["mongo"] = f"error: {str(e)}"
+    try:
+        get_ollama_client().with_options(timeout=READINESS_TIMEOUT_SECONDS, max_retries=0).models.list()
+        checks["ollama"] = "ok"
+    except Exception as e:
+        checks["ollama"] = f"error: {str(e)}"
+    return {
+        "ready": all(status == "ok" for status in checks.values()),
+        "checks": checks,
+        "initialized": registry.initialized(),
+    }
@@ -0,0 +1,243 @@
+# ======================================================================================================
+#                                               imports
+# ======================================================================================================
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+vector_logger = logging.getLogger('vector_index')
+
+# ======================================================================================================
+#                                       vector index configuration
+# ======================================================================================================
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "cache/vector_index")
+# Rows scored per step while searching, bounds the memory touched at once
+SEARCH_BLOCK_ROWS = int(os.getenv("SEARCH_BLOCK_ROWS", "65536"))
+
+# ======================================================================================================
+#                                       memory-mapped vector store
+# ======================================================================================================
+
+class VectorIndex:
+    """Append-only, memory-mapped matrix of unit-length float32 vectors with an id map.
+
+    ``vectors.f32`` holds the rows back to back and ``ids.txt`` the id of every row, one per
+    line. Adding a vector for an id that is already present appends a new row that supersedes
+    the old one, so updates never rewrite the files; ``rebuild`` compacts them. Appends take a
+    file lock, so the API and the command line tools can add to the same index.
+    """
+
+    def __init__(self, directory: str, model_name: str):
+        self.directory = directory
+        self.model_name = model_name
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.ids_path = os.path.join(directory, "ids.txt")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        self._loaded_size = None
+        self._matrix = None
+        self._ids: List[str] = []
+        self._current = np.zeros(0, dtype=bool)
+
+    # ------------------------------------------------------------------ files
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.meta_path):
+            return None
+        with open(self.meta_path) as file:
+            return json.load(file)
+
+    def _write_meta(self, path: str, dim: int) -> None:
+        with open(path, "w") as file:
+            json.dump({"dim": dim, "model": self.model_name}, file)
+
+    @contextmanager
+    def _file_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _normalize(vectors: List[List[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def _check_meta(self, dim: int) -> None:
+        meta = self._read_meta()
+        if meta is None:
+            return
+        if meta["dim"] != dim or meta["model"] != self.model_name:
+            raise ValueError(
+                f"Vector index was built with {meta['model']} ({meta['dim']} dims); "
+                f"rebuild it for {self.model_name} ({dim} dims)"
+            )
+
+    # ------------------------------------------------------------------ writes
+
+    def add(self, ids: List[str], vectors: List[List[float]]) -> None:
+        """Append (or supersede) the vectors of ``ids``"""
+        if not ids:
+            return
+        matrix = self._normalize(vectors)
+        with self._lock, self._file_lock():
+            self._check_meta(matrix.shape[1])
+            if self._read_meta() is None:
+                self._write_meta(self.meta_path, matrix.shape[1])
+            # Vectors are written before ids: a row only counts once its id line exists
+            with open(self.vectors_path, "ab") as file:
+                file.write(matrix.tobytes())
+            with open(self.ids_path, "a") as file:
+                file.write("".join(f"{resume_id}\n" for resume_id in ids))
+        vector_logger.info(f"Added {len(ids)} vectors to the candidate index")
+
+    def _file_sizes(self) -> Tuple[int, int]:
+        return tuple(os.path.getsize(path) if os.path.exists(path) else 0 for path in (self.vectors_path, self.ids_path))
+
+    def _carry_over(self, snapshot: Tuple[int, int], vectors_tmp: str, ids_tmp: str, dim: Optional[int]) -> Tuple[int, Optional[int]]:
+        """Copy the rows appended to the live files since ``snapshot`` into the rebuilt ones.
+
+        Called with the file lock held. Returns the number of rows copied and the dimension of
+        the rebuilt index.
+        """
+        sizes, meta = self._file_sizes(), self._read_meta()
+        if meta is None or sizes == snapshot:
+            return 0, dim
+        if sizes[0] < snapshot[0] or sizes[1] < snapshot[1] or meta["model"] != self.model_name or dim not in (None, meta["dim"]):
+            vector_logger.warning("Candidate index was replaced or changed model during the rebuild, rows added meanwhile are dropped")
+            return 0, dim
+        with open(self.vectors_path, "rb") as file:
+            file.seek(snapshot[0])
+            vectors = file.read()
+        with open(self.ids_path, "rb") as file:
+            file.seek(snapshot[1])
+            ids = file.read().split()
+        rows = min(len(vectors) // (meta["dim"] * 4), len(ids))
+        with open(vectors_tmp, "ab") as file:
+            file.write(vectors[:rows * meta["dim"] * 4])
+        with open(ids_tmp, "ab") as file:
+            file.write(b"".join(resume_id + b"\n" for resume_id in ids[:rows]))
+        return rows, meta["dim"]
+
+    def rebuild(self, batches: Iterable[Tuple[List[str], List[List[float]]]]) -> int:
+        """Replace the whole index with the given (ids, vectors) batches.
+
+        Appends are not blocked while the batches are produced (that is a full re-embedding):
+        rows added meanwhile are copied into the new files right before they replace the old ones.
+        """
+        vectors_tmp, ids_tmp, meta_tmp = (f"{path}.tmp" for path in (self.vectors_path, self.ids_path, self.meta_path))
+        total, dim = 0, None
+        os.makedirs(self.directory, exist_ok=True)
+        with self._file_lock():
+            snapshot = self._file_sizes()
+        with open(vectors_tmp, "wb") as vectors_file, open(ids_tmp, "w") as ids_file:
+            for ids, vectors in batches:
+                if not ids:
+                    continue
+                matrix = self._normalize(vectors)
+                dim = matrix.shape[1]
+                vectors_file.write(matrix.tobytes())
+                ids_file.write("".join(f"{resume_id}\n" for resume_id in ids))
+                total += len(ids)
+        with self._lock, self._file_lock():
+            carried, dim = self._carry_over(snapshot, vectors_tmp, ids_tmp, dim)
+            if dim is not None:
+                self._write_meta(meta_tmp, dim)
+                os.replace(meta_tmp, self.meta_path)
+            elif os.path.exists(self.meta_path):
+                os.remove(self.meta_path)
+            os.replace(vectors_tmp, self.vectors_path)
+            os.replace(ids_tmp, self.ids_path)
+            self._loaded_size = None
+        vector_logger.info(f"Rebuilt the candidate index with {total} vectors ({carried} added during the rebuild)")
+        return total + carried
+
+    # ------------------------------------------------------------------ reads
+
+    def _refresh(self) -> None:
+        """Re-map the files when another thread or process appended to them"""
+        meta = self._read_meta()
+        size = os.path.getsize(self.vectors_path) if meta and os.path.exists(self.vectors_path) else 0
+        # Both sizes: add() writes the vectors before the ids, so a refresh in between sees new
+        # vector bytes without their ids and must run again once the ids are written
+        ids_size = os.path.getsize(self.ids_path) if size and os.path.exists(self.ids_path) else 0
+        if (size, ids_size) == self._loaded_size:
+            return
+        self._loaded_size = (size, ids_size)
+        if not size:
+            self._matrix, self._ids, self._current = None, [], np.zeros(0, dtype=bool)
+            return
+        with open(self.ids_path) as file:
+            ids = file.read().split()
+        rows = min(size // (meta["dim"] * 4), len(ids))
+        self._ids = ids[:rows]
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, meta["dim"]))
+        # Only the last row of every id is searched
+        latest = {resume_id: row for row, resume_id in enumerate(self._ids)}
+        self._current = np.zeros(rows, dtype=bool)
+        self._current[list(latest.values())] = True
+
+    def search(self, vector: List[float], k: int) -> List[Tuple[str, float]]:
+        """The ``k`` ids with the highest cosine similarity to ``vector``"""
+        with self._lock:
+            self._refresh()
+            matrix, ids, current = self._matrix, self._ids, self._current
+        if matrix is None or k <= 0:
+            return []
+        self._check_meta(len(vector))
+        query = self._normalize([vector])[0]
+        scores = np.empty(len(ids), dtype=np.float32)
+        for start in range(0, len(ids), SEARCH_BLOCK_ROWS):
+            scores[start:start + SEARCH_BLOCK_ROWS] = matrix[start:start + SEARCH_BLOCK_ROWS] @ query
+        scores[~current] = -np.inf
+        k = min(k, int(current.sum()))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[row], float(scores[row])) for row in top]
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {"rows": len(self._ids), "candidates": int(self._current.sum()), "directory": self.directory}
+
+# ======================================================================================================
+#                                       command line entry point
+# ======================================================================================================
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or query the semantic candidate index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="Re-embed every stored resume and compact the index")
+    search_parser = subparsers.add_parser("search", help="Rank candidates for a free-text query")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    # Imported here: backend itself imports this module
+    from backend import rebuild_candidate_index, search_candidates
+
+    if args.command == "rebuild":
+        result = {"indexed": rebuild_candidate_index()}
+    else:
+        result = search_candidates(args.query, args.limit)
+    json.dump(result, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())